@@ -1,204 +1,107 @@
-from flask import Flask, request, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from flask_cors import CORS
-from flask_socketio import SocketIO, send, emit, join_room, leave_room
-from flask_migrate import Migrate
-from models import db, User, Message, Toy  # Import models
-
-app = Flask(__name__)
-
-# Configure Flask app
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///toy_trading.db"  # Change for production
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["JWT_SECRET_KEY"] = "supersecretkey"  # Change in production
-
-# Initialize extensions
-db.init_app(app)
-bcrypt = Bcrypt(app)
-jwt = JWTManager(app)
-CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*")  # Enable real-time chat
-migrate = Migrate(app, db)
-
-# ============================
-# 1️⃣ USER SIGNUP (REGISTER)
-# ============================
-@app.route("/signup", methods=["POST"])
-def signup():
-    data = request.json
-    username = data.get("username")
-    email = data.get("email")
-    phone_number = data.get("phone_number")
-    password = data.get("password")
-
-    if User.query.filter_by(email=email).first():
-        return jsonify({"error": "Email already exists"}), 400
-
-    hashed_password = bcrypt.generate_password_hash(password).decode("utf-8")
-    new_user = User(username=username, email=email, phone_number=phone_number, password=hashed_password)
-
-    db.session.add(new_user)
-    db.session.commit()
-    return jsonify({"message": "User registered successfully!"}), 201
-
-# ============================
-# 2️⃣ USER LOGIN
-# ============================
-@app.route("/login", methods=["POST"])
-def login():
-    data = request.json
-    email = data.get("email")
-    password = data.get("password")
-
-    user = User.query.filter_by(email=email).first()
-    if user and bcrypt.check_password_hash(user.password, password):
-        access_token = create_access_token(identity=str(user.id))
-        return jsonify({"access_token": access_token, "user_id": user.id}), 200
-    return jsonify({"error": "Invalid email or password"}), 401
-
-# ============================
-# 3️⃣ HOME PAGE (SHOW TOYS)
-# ============================
-@app.route("/home", methods=["GET"])
-def home():
-    toys = Toy.query.all()
-    toy_list = [{"id": toy.id, "name": toy.name, "price": toy.price, "image": toy.image_filename} for toy in toys]
-    return jsonify(toy_list), 200
-
-# ============================
-# 4️⃣ REAL-TIME CHAT (WebSockets)
-# ============================
-
-# Store chat rooms
-rooms = {}
-
-# Handle user joining a room
-@socketio.on("join")
-def handle_join(data):
-    username = data["user"]
-    room = data["room"]
-    
-    join_room(room)
-    emit("message", {"user": "System", "text": f"{username} has joined the chat."}, room=room)
-
-# Handle sending messages
-@socketio.on("message")
-def handle_message(data):
-    sender = data["user"]
-    message_text = data["message"]
-    room = data["room"]
+import os
 
-    sender_user = User.query.filter_by(username=sender).first()
-    if not sender_user:
-        return  # Don't store messages from unknown users
-
-    # Get receiver from the room (assuming room names are unique for users)
-    receiver_user = User.query.filter(User.username != sender).first()  
-
-    # Store in database
-    new_message = Message(
-        message_text=message_text,
-        sender_id=sender_user.id,
-        receiver_id=receiver_user.id if receiver_user else None,
-        room=room # ✅ Store room in the database
-    )
-
-    db.session.add(new_message)
-    db.session.commit()
-
-    # Emit the message back to all clients
-    emit("message", {"user": sender, "text": message_text, "room": room}, room=room)
-
-# Handle user leaving a room
-@socketio.on("leave")
-def handle_leave(data):
-    username = data["user"]
-    room = data["room"]
-
-    leave_room(room)
-    emit("message", {"user": "System", "text": f"{username} has left the chat."}, room=room)
-
-# ============================
-# 5️⃣ Fetch messages from database
-# ============================
-
-@app.route("/messages/<room>", methods=["GET"])
-def get_messages(room):
-    messages = Message.query.filter_by(room=room).all()  # 🔥 Filter by room!
-    
-    messages_data = [
-        {
-            "id": msg.id,
-            "message": msg.message_text,
-            "timestamp": msg.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-            "sender": User.query.get(msg.sender_id).username,
-        }
-        for msg in messages
-    ]
-    return {"messages": messages_data}, 200
-
-
-# ============================
-# 5️⃣ PROFILE PAGE
-# ============================
-@app.route('/profile', methods=['GET'])
-@jwt_required()
-def get_profile():
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-
-    toys = [
-        {
-            "id": toy.id,
-            "name": toy.name,
-            "age_group": toy.age_group,
-            "description": toy.description,
-            "condition": toy.condition,
-            "price": toy.price,
-            "image_filename": toy.image_filename
-        } for toy in user.toys
-    ]
-
-    return jsonify({
-        "username": user.username,
-        "email": user.email,
-        "phone_number": user.phone_number,
-        "toys": toys
-    }), 200
-
-
-@app.route('/create-toy', methods=['POST'])
-@jwt_required()
-def create_toy():
-    user_id = get_jwt_identity()
-    data = request.get_json()
-    print("Received toy data:", data)  # Add this line to debug
-
-    required_fields = ["name", "age_group", "description", "condition", "price", "image_filename"]
-    if not all(field in data and data[field] for field in required_fields):
-        return jsonify({"error": "Missing or invalid toy data"}), 422
-
-    toy = Toy(
-        name=data['name'],
-        age_group=data['age_group'],
-        description=data['description'],
-        condition=data['condition'],
-        price=data['price'],
-        image_filename=data['image_filename'],
-        user_id=user_id
+from flask import Flask
+from flask_bcrypt import Bcrypt
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from models import db  # Import models
+from config import configs
+from database import engine_options
+from extensions import cors, jwt, socketio
+from cache import ResponseCache
+from message_writer import MessageWriter
+from user_cache import UserCache
+from password_hasher import PasswordHasher
+from image_store import ImageStore
+from presence import PresenceRegistry
+from jwt_cache import MemoryBlocklist, VerifiedTokenCache
+from rate_limit import RateLimiter
+from similar import SimilarToys
+from metrics import Metrics
+from compression import Compressor
+from serializers import FastJSONProvider
+from search import create_search_index
+from socket_queue import PresenceRelay, queue_options
+from blueprints import auth, chat, images, profile, toys, trading
+
+
+def create_app(config=None):
+    """Build a configured app.
+
+    ``config`` is an environment name (``development``, ``testing``,
+    ``production``), a config class, or a dict of overrides applied on top
+    of the ``FLASK_CONFIG`` environment. Run it under a server with e.g.
+    ``gunicorn -k eventlet -w 1 'app:create_app()'``.
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)  # orjson behind jsonify when installed
+
+    # Configure Flask app
+    overrides = config if isinstance(config, dict) else {}
+    if config is None or isinstance(config, dict):
+        config = os.environ.get("FLASK_CONFIG", "development")
+    app.config.from_object(configs[config] if isinstance(config, str) else config)
+    app.config.update(overrides)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config["SQLALCHEMY_DATABASE_URI"]))
+    if app.config["TRUSTED_PROXIES"]:
+        # Client IPs (for rate limits) from X-Forwarded-For instead of the proxy's address
+        hops = app.config["TRUSTED_PROXIES"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+    # Initialize extensions
+    db.init_app(app)
+    bcrypt = Bcrypt(app)
+    jwt.init_app(app)
+    cors.init_app(app)
+    socketio.init_app(
+        app,
+        cors_allowed_origins="*",
+        async_mode=app.config["SOCKETIO_ASYNC_MODE"],
+        **queue_options(app.config["SOCKETIO_MESSAGE_QUEUE"])
+    )  # Enable real-time chat
+    # Alembic is slow to import and only the `flask db` commands need it
+    if app.config["ENABLE_MIGRATE"] or os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    # Per-app helpers, reached from the blueprints through extensions.py
+    message_writer = MessageWriter(app, batch_size=100, flush_interval=0.5, max_backlog=10000)
+    password_hasher = PasswordHasher(app, bcrypt, async_mode=socketio.async_mode)
+    ImageStore(app)
+    user_cache = app.extensions["user_cache"] = UserCache(maxsize=10000, ttl=300)
+    presence = app.extensions["presence"] = PresenceRegistry()
+    if isinstance(socketio.server.manager, PresenceRelay):
+        socketio.server.manager.share_presence(presence)  # chat rooms span every worker on the queue
+    app.extensions["home_cache"] = ResponseCache(maxsize=256, ttl=app.config["HOME_CACHE_TTL"])  # serialized /home pages
+    token_cache = app.extensions["token_cache"] = VerifiedTokenCache(
+        maxsize=app.config["JWT_VERIFY_CACHE_SIZE"],
+        ttl=app.config["JWT_VERIFY_CACHE_TTL"],
+        leeway=app.config["JWT_DECODE_LEEWAY"],
     )
-    db.session.add(toy)
-    db.session.commit()
-    return jsonify({"message": "Toy created successfully"}), 201
+    token_blocklist = app.extensions["token_blocklist"] = MemoryBlocklist(maxsize=app.config["JWT_BLOCKLIST_MAXSIZE"])
+    rate_limiter = RateLimiter(app)
+    similar_toys = SimilarToys(app, async_mode=socketio.async_mode)
+    metrics = Metrics(app, db)
+    compressor = Compressor(app)  # after Metrics, so request timings include compression
+    metrics.add_collector("chat_writer", message_writer.stats)
+    metrics.add_collector("user_cache", user_cache.stats)
+    metrics.add_collector("password_hasher", password_hasher.stats)
+    metrics.add_collector("jwt_cache", token_cache.stats)
+    metrics.add_collector("token_blocklist", token_blocklist.stats)
+    metrics.add_collector("rate_limit", rate_limiter.stats)
+    metrics.add_collector("similar_toys", similar_toys.stats)
+    metrics.add_collector("compression", compressor.stats)
+
+    for blueprint in (auth, images, toys, chat, profile, trading):
+        app.register_blueprint(blueprint.bp)
+    return app
 
 # ============================
 # 6️⃣ RUN SERVER
 # ============================
 if __name__ == "__main__":
+    app = create_app()
     with app.app_context():
         db.create_all()  # Create tables if they don’t exist
+        create_search_index()  # FTS table and sync triggers for /toys/search
     socketio.run(app, debug=True, host="0.0.0.0", port=5000)  # Run with SocketIO
@@ -0,0 +1,77 @@
+"""Measure how long bcrypt work freezes the eventlet loop.
+
+Runs a burst of concurrent password checks while a ticker greenlet sleeps
+1ms at a time and records how late it wakes up. Compares calling
+Flask-Bcrypt inline (the old /login behaviour) with PasswordHasher.
+
+Run from the app/ directory:
+
+    python -m benchmarks.bcrypt_stall --logins 32 --rounds 12
+"""
+import argparse
+import statistics
+import time
+
+import eventlet
+from flask import Flask
+from flask_bcrypt import Bcrypt
+
+from password_hasher import PasswordHasher
+
+
+def measure(check, pw_hash, logins):
+    stalls = []
+    running = True
+
+    def ticker():
+        while running:
+            started = time.perf_counter()
+            eventlet.sleep(0.001)
+            stalls.append(time.perf_counter() - started - 0.001)
+
+    tick = eventlet.spawn(ticker)
+    eventlet.sleep(0)
+    started = time.perf_counter()
+    pool = eventlet.GreenPool(logins)
+    for _ in range(logins):
+        pool.spawn(check, pw_hash, "correct horse")
+    pool.waitall()
+    elapsed = time.perf_counter() - started
+    running = False
+    tick.wait()
+
+    stalls.sort()
+    return {
+        "elapsed_s": elapsed,
+        "max_stall_ms": stalls[-1] * 1000,
+        "p99_stall_ms": stalls[min(len(stalls) - 1, int(len(stalls) * 0.99))] * 1000,
+        "median_stall_ms": statistics.median(stalls) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config["BCRYPT_LOG_ROUNDS"] = args.rounds
+    app.config["PASSWORD_HASH_WORKERS"] = args.workers
+    app.config["PASSWORD_HASH_MAX_PENDING"] = args.logins
+    bcrypt = Bcrypt(app)
+    hasher = PasswordHasher(app, bcrypt, async_mode="eventlet")
+    pw_hash = bcrypt.generate_password_hash("correct horse")
+
+    for label, check in (("inline", bcrypt.check_password_hash), ("pooled", hasher.check_password_hash)):
+        result = measure(check, pw_hash, args.logins)
+        print(
+            f"{label:>6}: {args.logins} logins in {result['elapsed_s']:.2f}s, "
+            f"loop stall max {result['max_stall_ms']:.1f}ms "
+            f"p99 {result['p99_stall_ms']:.1f}ms median {result['median_stall_ms']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
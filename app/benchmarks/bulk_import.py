@@ -0,0 +1,77 @@
+"""Compare toy creation through /create-toy with /toys/bulk.
+
+Uses a throwaway SQLite file so commit costs are real. Run from app/:
+
+    python -m benchmarks.bulk_import --toys 2000
+"""
+import argparse
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="toy-bench-")
+atexit.register(shutil.rmtree, _db_dir, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("BCRYPT_LOG_ROUNDS", "4")
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import User, db  # noqa: E402
+from search import create_search_index  # noqa: E402
+
+app = create_app()
+
+
+def toy(i):
+    return {
+        "name": f"toy {i}",
+        "age_group": "3-5",
+        "description": "benchmark toy",
+        "condition": "new",
+        "price": i % 100 + 1,
+        "image_filename": f"toy-{i}.png",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--toys", type=int, default=2000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        create_search_index()
+        user = User(username="bench", email="bench@example.com", phone_number="0", password="x")
+        db.session.add(user)
+        db.session.commit()
+        headers = {"Authorization": "Bearer " + create_access_token(identity=str(user.id))}
+
+    client = app.test_client()
+    toys = [toy(i) for i in range(args.toys)]
+
+    started = time.perf_counter()
+    for data in toys:
+        assert client.post("/create-toy", json=data, headers=headers).status_code == 201
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    assert client.post("/toys/bulk", json=toys, headers=headers).status_code == 201
+    bulk_json = time.perf_counter() - started
+
+    ndjson = "\n".join(json.dumps(data) for data in toys)
+    started = time.perf_counter()
+    response = client.post("/toys/bulk", data=ndjson, content_type="application/x-ndjson", headers=headers)
+    assert response.status_code == 201
+    bulk_ndjson = time.perf_counter() - started
+
+    for label, elapsed in (("single /create-toy", single), ("bulk JSON", bulk_json), ("bulk NDJSON", bulk_ndjson)):
+        print(f"{label:>18}: {args.toys} toys in {elapsed:.2f}s = {args.toys / elapsed:,.0f} toys/s")
+
+
+if __name__ == "__main__":
+    main()
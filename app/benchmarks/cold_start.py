@@ -0,0 +1,72 @@
+"""Cold start cost: importing the app module and building an app.
+
+Each sample is a fresh interpreter (what a pre-forked worker pays) that
+imports ``app`` and calls ``create_app("testing")``; run once as the server
+would and once with ``ENABLE_MIGRATE=1``, which brings back the eager
+Flask-Migrate/Alembic import. Then times ``create_app`` in-process, the cost
+of one isolated app per test. Run from app/:
+
+    python -m benchmarks.cold_start --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app("testing")
+built = time.perf_counter()
+heavy = [name for name in ("flask_migrate", "alembic", "PIL") if name in sys.modules]
+print(json.dumps({"import_ms": (imported - started) * 1000, "create_ms": (built - imported) * 1000, "loaded": heavy}))
+"""
+
+
+def sample(runs, extra_env):
+    env = dict(os.environ, **extra_env)
+    results = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        result["process_ms"] = (time.perf_counter() - started) * 1000
+        results.append(result)
+    return results
+
+
+def report(label, results):
+    print(
+        f"{label:>16}: process {statistics.median(r['process_ms'] for r in results):7.1f}ms  "
+        f"import {statistics.median(r['import_ms'] for r in results):7.1f}ms  "
+        f"create_app {statistics.median(r['create_ms'] for r in results):6.1f}ms  "
+        f"heavy modules loaded: {', '.join(results[0]['loaded']) or 'none'}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per variant")
+    parser.add_argument("--apps", type=int, default=50, help="in-process create_app calls")
+    args = parser.parse_args()
+
+    report("lazy (default)", sample(args.runs, {"ENABLE_MIGRATE": "0"}))
+    report("ENABLE_MIGRATE=1", sample(args.runs, {"ENABLE_MIGRATE": "1"}))
+
+    from app import create_app
+
+    create_app("testing")
+    started = time.perf_counter()
+    for _ in range(args.apps):
+        create_app("testing")
+    elapsed = (time.perf_counter() - started) / args.apps
+    print(f"{'per-test app':>16}: create_app('testing') {elapsed * 1000:.2f}ms each over {args.apps} apps")
+
+
+if __name__ == "__main__":
+    main()
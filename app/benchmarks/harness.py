@@ -0,0 +1,259 @@
+"""Load-test harness for the HTTP and Socket.IO hot paths.
+
+Seeds a throwaway SQLite database with synthetic users, toys and chat
+messages, then drives each scenario from ``--concurrency`` threads through
+the Flask and Socket.IO test clients. For every scenario it reports
+p50/p95/p99 latency, throughput and SQL statements per operation, and
+writes the results to JSON so runs can be compared across commits.
+
+Run from app/:
+
+    python -m benchmarks.harness --users 200 --toys 20000 --messages 50000
+    python -m benchmarks.harness --compare benchmarks/results/<old>.json
+"""
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+SCENARIOS = ["home", "search", "messages", "login", "profile", "socket_message"]
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+def seed(app, db, args):
+    from sqlalchemy import insert
+
+    from models import Message, Toy, User
+    from search import create_search_index
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        db.create_all()
+        create_search_index()
+        password = app.extensions["password_hasher"].generate_password_hash("password")
+        db.session.execute(insert(User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "phone_number": "0700000000", "password": password}
+            for i in range(1, args.users + 1)
+        ])
+        words = ["truck", "doll", "lego", "bear", "robot", "puzzle", "train", "ball", "kite", "blocks"]
+        toys = [
+            {
+                "name": f"{rng.choice(words)} {rng.choice(words)} {i}",
+                "age_group": rng.choice(["0-2", "3-5", "6-8", "9+"]),
+                "description": " ".join(rng.choice(words) for _ in range(12)),
+                "condition": rng.choice(["new", "like new", "used"]),
+                "price": round(rng.uniform(1, 200), 2),
+                "image_filename": f"toy-{i}.png",
+                "user_id": rng.randint(1, args.users),
+            }
+            for i in range(args.toys)
+        ]
+        for start in range(0, len(toys), 5000):
+            db.session.execute(insert(Toy), toys[start:start + 5000])
+        started = datetime(2025, 1, 1)
+        messages = []
+        for i in range(args.messages):
+            room = rng.randint(1, args.rooms)
+            messages.append({
+                "message_text": f"message {i} about the {rng.choice(words)}",
+                "sender_id": room % args.users + 1,
+                "receiver_id": (room + 1) % args.users + 1,
+                "room": f"room-{room}",
+                "timestamp": started + timedelta(seconds=i),
+            })
+        for start in range(0, len(messages), 5000):
+            db.session.execute(insert(Message), messages[start:start + 5000])
+        db.session.commit()
+
+
+def make_operations(app, socketio, args):
+    from flask_jwt_extended import create_access_token
+
+    rng = random.Random(args.seed + 1)
+    local = threading.local()
+    words = ["truck", "doll", "lego", "bear", "robot", "puzzle"]
+    with app.app_context():
+        tokens = [create_access_token(identity=str(user)) for user in range(1, args.users + 1)]
+
+    def http():
+        if not hasattr(local, "http"):
+            local.http = app.test_client()
+        return local.http
+
+    def socket_client():
+        if not hasattr(local, "socket"):
+            local.socket = socketio.test_client(app)
+        return local.socket
+
+    def home():
+        after = rng.randint(0, max(args.toys - 50, 0))
+        response = http().get(f"/home?after={after}&limit=50")
+        assert response.status_code == 200, response.status_code
+
+    def search():
+        response = http().get(f"/toys/search?q={rng.choice(words)}&limit=20")
+        assert response.status_code == 200, response.status_code
+
+    def messages():
+        response = http().get(f"/messages/room-{rng.randint(1, args.rooms)}?limit=100")
+        assert response.status_code == 200, response.status_code
+
+    def login():
+        user = rng.randint(1, args.users)
+        response = http().post("/login", json={"email": f"user{user}@example.com", "password": "password"})
+        assert response.status_code == 200, response.status_code
+
+    def profile():
+        response = http().get("/profile", headers={"Authorization": f"Bearer {rng.choice(tokens)}"})
+        assert response.status_code == 200, response.status_code
+
+    def socket_message():
+        user = rng.randint(1, args.users)
+        socket_client().emit("message", {"user": f"user{user}", "message": "benchmark", "room": f"room-{rng.randint(1, args.rooms)}"})
+        socket_client().get_received()
+
+    return {"home": home, "search": search, "messages": messages, "login": login, "profile": profile, "socket_message": socket_message}
+
+
+def run_scenario(operation, requests, concurrency, counter):
+    latencies = []
+    lock = threading.Lock()
+
+    def timed(_):
+        started = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+
+    queries_before = counter.count
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - started
+    queries = counter.count - queries_before
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "sql_queries_per_op": round(queries / requests, 2),
+    }
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"\nvs {baseline_path} ({baseline['commit']}):")
+    for name, result in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if not old:
+            continue
+        changes = []
+        for key in ("p50_ms", "p99_ms", "throughput_rps", "sql_queries_per_op"):
+            if old[key]:
+                changes.append(f"{key} {100 * (result[key] - old[key]) / old[key]:+.1f}%")
+        print(f"  {name:>15}: " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--toys", type=int, default=20000)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500, help="operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    # The app reads its configuration from the environment at import time
+    db_dir = tempfile.mkdtemp(prefix="toy-bench-")
+    atexit.register(shutil.rmtree, db_dir, ignore_errors=True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    os.environ["BCRYPT_LOG_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ["SOCKETIO_ASYNC_MODE"] = "threading"
+    os.environ["RATE_LIMIT_ENABLED"] = "0"  # every simulated client shares one IP
+    os.environ.setdefault("SLOW_QUERY_MS", "10000")
+
+    from sqlalchemy import event
+
+    from app import create_app
+    from extensions import socketio
+    from models import db
+
+    app = create_app()
+
+    seed(app, db, args)
+    counter = QueryCounter()
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", counter)
+
+    operations = make_operations(app, socketio, args)
+    results = {
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "scenarios": {},
+    }
+    for name in args.scenarios:
+        result = run_scenario(operations[name], args.requests, args.concurrency, counter)
+        results["scenarios"][name] = result
+        print(
+            f"{name:>15}: {result['throughput_rps']:>9,.1f} req/s  p50 {result['p50_ms']:.2f}ms  "
+            f"p95 {result['p95_ms']:.2f}ms  p99 {result['p99_ms']:.2f}ms  sql/op {result['sql_queries_per_op']}"
+        )
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"{results['commit']}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"\nwrote {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
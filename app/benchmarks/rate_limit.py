@@ -0,0 +1,92 @@
+"""Cost of the rate limiter on the accept path.
+
+Times ``MemoryBackend.take`` from one and several threads, and the
+``rate_limited``/``rate_limited_event`` decorators against the same
+function undecorated, with limits high enough that every call is
+accepted. Finally drains one bucket to check it rejects exactly past its
+capacity. Run from app/:
+
+    python -m benchmarks.rate_limit --calls 200000 --clients 1000
+"""
+import argparse
+import threading
+import time
+
+from app import create_app
+from models import db
+from rate_limit import MemoryBackend, rate_limited, rate_limited_event
+
+
+def per_call_us(fn, calls):
+    fn()
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def threaded_us(backend, calls, threads, clients):
+    per_thread = calls // threads
+
+    def run(offset):
+        for index in range(per_thread):
+            backend.take(f"client-{(offset + index) % clients}", 1e9, 1e9)
+
+    workers = [threading.Thread(target=run, args=(offset,)) for offset in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - started) / (per_thread * threads) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    backend = MemoryBackend()
+    keys = [f"client-{index}" for index in range(args.clients)]
+    counter = iter(range(10 ** 12))
+    take = lambda: backend.take(keys[next(counter) % args.clients], 1e9, 1e9)  # noqa: E731
+    print(f"MemoryBackend.take, 1 thread:       {per_call_us(take, args.calls):.2f}us")
+    print(f"MemoryBackend.take, {args.threads} threads:      {threaded_us(backend, args.calls, args.threads, args.clients):.2f}us")
+
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "SOCKETIO_ASYNC_MODE": "threading",
+        "RATE_LIMIT_ENABLED": True,
+        "RATE_LIMITS": {"bench": "1000000000/second"},
+    })
+    view = lambda: None  # noqa: E731
+    with app.test_request_context("/login", method="POST") as context:
+        context.request.sid = "bench"  # as Flask-SocketIO sets for events
+        bare = per_call_us(view, args.calls)
+        route = per_call_us(rate_limited("bench")(view), args.calls)
+        event = per_call_us(rate_limited_event("bench")(view), args.calls)
+    print(f"@rate_limited overhead:             {route - bare:.2f}us")
+    print(f"@rate_limited_event overhead:       {event - bare:.2f}us")
+
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "SOCKETIO_ASYNC_MODE": "threading",
+        "RATE_LIMIT_ENABLED": True,
+        "RATE_LIMITS": {"login": "10/minute"},
+    })
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    responses = [client.post("/login", json={}) for _ in range(12)]
+    statuses = [response.status_code for response in responses]
+    print(
+        f"login burst at 10/minute: {statuses.count(429)} of 12 rejected, "
+        f"Retry-After {responses[-1].headers.get('Retry-After')}s, "
+        f"counted {app.extensions['rate_limiter'].stats()['rejected_login']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Payload size and CPU of JSON serialization and response compression.
+
+Seeds a throwaway SQLite database with toys and one busy chat room, then
+reports, for /home, /profile and /messages pages, the identity, gzip and
+(when the ``brotli`` package is installed) br body sizes. It then times the
+query-and-serialize step of a /messages page the old way (``datetime`` per
+row, ``strftime``, stdlib ``json``) against ``serializers`` (timestamps
+formatted by the database, orjson when installed), and whole requests with
+and without gzip. Run from app/:
+
+    python -m benchmarks.serialization --toys 2000 --messages 20000
+"""
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_db_dir = tempfile.mkdtemp(prefix="toy-bench-")
+atexit.register(shutil.rmtree, _db_dir, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+import serializers  # noqa: E402
+from app import create_app  # noqa: E402
+from compression import brotli  # noqa: E402
+from extensions import user_cache  # noqa: E402
+from models import Message, Toy, User, db  # noqa: E402
+
+WORDS = "red blue wooden plastic soft plush truck car train doll bear robot puzzle blocks kite ball drum".split()
+
+
+def median_ms(fn, repeat):
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def history_query(timestamp):
+    return (
+        db.session.query(Message.id, Message.message_text, timestamp.label("timestamp"), Message.sender_id)
+        .filter(Message.room == "bench")
+        .order_by(Message.timestamp, Message.id)
+    )
+
+
+def old_messages(limit):
+    rows = history_query(Message.timestamp).limit(limit).all()
+    usernames = user_cache.usernames_for(row.sender_id for row in rows)
+    return json.dumps([
+        {
+            "id": row.id,
+            "message": row.message_text,
+            "timestamp": row.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            "sender": usernames.get(row.sender_id),
+        } for row in rows
+    ]).encode("utf-8")
+
+
+def new_messages(limit):
+    rows = history_query(serializers.timestamp_text(Message.timestamp)).limit(limit).all()
+    usernames = user_cache.usernames_for(row.sender_id for row in rows)
+    return serializers.dumps([serializers.message(row, usernames) for row in rows])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--toys", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(username=name, email=f"{name}@example.com", phone_number=str(index), password="x")
+            for index, name in enumerate(["alice", "bob"])
+        ])
+        db.session.commit()
+        db.session.execute(insert(Toy), [
+            {
+                "name": f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+                "age_group": rng.choice(["0-2", "3-5", "6-8", "9+"]),
+                "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 20))),
+                "condition": rng.choice(["new", "like new", "used"]),
+                "price": round(rng.uniform(1, 200), 2),
+                "image_filename": f"{index:064x}.jpg",
+                "user_id": 1,
+            } for index in range(args.toys)
+        ])
+        started = datetime(2025, 1, 1)
+        db.session.execute(insert(Message), [
+            {
+                "message_text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 12))),
+                "sender_id": 1 + index % 2,
+                "receiver_id": 2 - index % 2,
+                "room": "bench",
+                "timestamp": started + timedelta(seconds=index, microseconds=rng.randint(0, 999999)),
+            } for index in range(args.messages)
+        ])
+        db.session.commit()
+        token = create_access_token(identity="1")
+
+    client = app.test_client()
+    auth = {"Authorization": f"Bearer {token}"}
+    encodings = ["gzip", "br"] if brotli is not None else ["gzip"]
+    print(f"orjson: {'yes' if serializers.orjson is not None else 'no'}, brotli: {'yes' if brotli else 'no'}")
+    print(f"{'endpoint':<28}{'identity':>10}" + "".join(f"{encoding:>10}" for encoding in encodings))
+    for path in ["/home?limit=200", "/profile", "/messages/bench?limit=500", "/messages/bench?limit=5000"]:
+        sizes = [len(client.get(path, headers=auth).data)]
+        for encoding in encodings:
+            response = client.get(path, headers={**auth, "Accept-Encoding": encoding})
+            assert response.headers.get("Content-Encoding") == encoding, path
+            sizes.append(len(response.data))
+        print(f"{path:<28}" + "".join(f"{size:>10}" for size in sizes))
+
+    with app.app_context():
+        for limit in (500, 5000):
+            assert json.loads(old_messages(limit)) == json.loads(new_messages(limit))
+            old = median_ms(lambda: old_messages(limit), args.repeat)
+            new = median_ms(lambda: new_messages(limit), args.repeat)
+            print(f"query + serialize {limit} messages: strftime + json {old:.1f}ms, serializers {new:.1f}ms")
+
+    for path in ["/home?limit=200", "/messages/bench?limit=500", "/messages/bench?limit=5000"]:
+        identity = median_ms(lambda: client.get(path).data, args.repeat)
+        gzipped = median_ms(lambda: client.get(path, headers={"Accept-Encoding": "gzip"}).data, args.repeat)
+        print(f"GET {path}: identity {identity:.1f}ms, gzip {gzipped:.1f}ms")
+    print(app.extensions["compressor"].stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Similar-toys index: rebuild, snapshot, incremental adds and lookups.
+
+Seeds a throwaway SQLite database with synthetic toys, times a full
+rebuild and a snapshot save/load, then adds ``--new`` toys one at a time
+the way /create-toy does and times each add, an in-memory lookup and the
+whole /toys/<id>/similar request. Finally rebuilds from scratch and reports
+how many of each toy's top 10 the incremental index agreed on. Run from
+app/:
+
+    python -m benchmarks.similar_toys --toys 20000 --new 500
+"""
+import argparse
+import atexit
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="toy-bench-")
+atexit.register(shutil.rmtree, _db_dir, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ["SIMILAR_TOYS_SNAPSHOT"] = os.path.join(_db_dir, "similar_toys.pickle")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import Toy, User, db  # noqa: E402
+
+KINDS = "truck car train plane boat doll bear bunny robot dinosaur puzzle blocks lego kite ball drum xylophone " \
+        "piano guitar book crayons easel kitchen tea set castle dollhouse scooter bike helmet rocket".split()
+TRAITS = "red blue green yellow pink wooden plastic soft plush metal magnetic electric remote musical " \
+         "talking glowing giant mini vintage classic stacking building learning counting alphabet".split()
+WORDS = KINDS + TRAITS + "wheels batteries pieces sound lights box instructions spare parts stickers".split()
+
+
+def toy(rng, user_id):
+    return {
+        "name": f"{rng.choice(TRAITS)} {rng.choice(TRAITS)} {rng.choice(KINDS)}",
+        "age_group": rng.choice(["0-2", "3-5", "6-8", "9+"]),
+        "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 20))),
+        "condition": rng.choice(["new", "like new", "used"]),
+        "price": round(rng.uniform(1, 200), 2),
+        "image_filename": "toy.png",
+        "user_id": user_id,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--toys", type=int, default=20000)
+    parser.add_argument("--new", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    index = app.extensions["similar_toys"]
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username="bench", email="bench@example.com", phone_number="0", password="x"))
+        db.session.commit()
+        db.session.execute(insert(Toy), [toy(rng, 1) for _ in range(args.toys)])
+        db.session.commit()
+
+        started = time.perf_counter()
+        index.rebuild()
+        print(f"rebuild {args.toys} toys: {time.perf_counter() - started:.2f}s")
+        started = time.perf_counter()
+        index.save(index.snapshot_path)
+        saved = time.perf_counter() - started
+        started = time.perf_counter()
+        index.load(index.snapshot_path)
+        print(f"snapshot: save {saved:.2f}s, load {time.perf_counter() - started:.2f}s, "
+              f"{os.path.getsize(index.snapshot_path) / 1e6:.1f} MB")
+
+        add_ms = []
+        for _ in range(args.new):
+            new_toy = Toy(**toy(rng, 1))
+            db.session.add(new_toy)
+            db.session.commit()
+            started = time.perf_counter()
+            index.add(new_toy)
+            add_ms.append((time.perf_counter() - started) * 1000)
+        print(f"incremental add: median {statistics.median(add_ms):.2f}ms, max {max(add_ms):.2f}ms")
+
+        ids = list(index.docs)
+        lookups = [rng.choice(ids) for _ in range(10000)]
+        started = time.perf_counter()
+        for toy_id in lookups:
+            index.similar_to(toy_id)
+        print(f"in-memory lookup: {(time.perf_counter() - started) / len(lookups) * 1e6:.2f}us")
+
+    client = app.test_client()
+    request_ms = []
+    for toy_id in lookups[:500]:
+        started = time.perf_counter()
+        response = client.get(f"/toys/{toy_id}/similar")
+        request_ms.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+    print(f"GET /toys/<id>/similar: median {statistics.median(request_ms):.2f}ms")
+
+    with app.app_context():
+        incremental = {toy_id: [other for _, other in index.similar_to(toy_id)[:10]] for toy_id in ids}
+        index.rebuild()
+        overlap = [
+            len(set(top) & {other for _, other in index.similar_to(toy_id)[:10]}) / max(len(top), 1)
+            for toy_id, top in incremental.items()
+        ]
+    print(f"top-10 agreement with a fresh rebuild: {statistics.mean(overlap):.0%}")
+
+
+if __name__ == "__main__":
+    main()
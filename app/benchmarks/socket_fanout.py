@@ -0,0 +1,97 @@
+"""Broadcast throughput across several Socket.IO worker processes.
+
+Starts a LocalBroker, then for each worker count runs that many processes,
+each with its own Socket.IO server on a ``local://`` queue and a few
+simulated clients joined to one room. The Flask-SocketIO test client refuses
+to run with a message queue, so packets are counted at the server instead.
+Every worker broadcasts ``--messages`` events to the room; the run ends when
+every client has seen every broadcast from every worker. Reports deliveries
+per second for each worker count.
+
+Run from the app/ directory:
+
+    python -m benchmarks.socket_fanout --workers 1 2 4 --messages 2000
+"""
+import argparse
+import multiprocessing
+import threading
+import time
+
+import socketio
+
+from socket_queue import LocalBroker, LocalQueueManager
+
+
+def worker(url, workers, messages, clients, ready, start, done):
+    server = socketio.Server(async_mode="threading", client_manager=LocalQueueManager(url))
+    server.manager_initialized = True
+    server.manager.initialize()
+
+    received = [0]
+    lock = threading.Lock()
+
+    def count_packet(eio_sid, eio_packet):
+        with lock:
+            received[0] += 1
+
+    server._send_eio_packet = count_packet
+    for index in range(clients):
+        sid = server.manager.connect(f"client-{index}", "/")
+        server.manager.enter_room(sid, "/", "bench")
+    time.sleep(0.5)  # let the subscriber connection come up
+    ready.wait()
+    start.wait()
+
+    for i in range(messages):
+        server.emit("message", {"user": "bench", "text": f"message {i}"}, to="bench")
+
+    expected = workers * messages * clients
+    while received[0] < expected:
+        time.sleep(0.001)
+    done.wait()
+
+
+def run(url, workers, messages, clients):
+    ready = multiprocessing.Barrier(workers + 1)
+    start = multiprocessing.Barrier(workers + 1)
+    done = multiprocessing.Barrier(workers + 1)
+    processes = [
+        multiprocessing.Process(target=worker, args=(url, workers, messages, clients, ready, start, done))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    ready.wait()
+    started = time.perf_counter()
+    start.wait()
+    done.wait()
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    broker = LocalBroker("127.0.0.1", args.port)
+    threading.Thread(target=broker.serve_forever, daemon=True).start()
+    url = f"local://127.0.0.1:{args.port}"
+
+    for workers in args.workers:
+        elapsed = run(url, workers, args.messages, args.clients)
+        deliveries = workers * args.messages * workers * args.clients
+        print(
+            f"{workers} worker(s): {workers * args.messages} broadcasts, "
+            f"{deliveries} deliveries in {elapsed:.2f}s = {deliveries / elapsed:,.0f} deliveries/s"
+        )
+    broker.shutdown()
+
+
+if __name__ == "__main__":
+    main()
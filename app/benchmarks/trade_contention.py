@@ -0,0 +1,88 @@
+"""Hundreds of buyers racing to pay for the same toy.
+
+Every buyer creates a payment (sent twice with the same Idempotency-Key to
+mimic a client retry) and the seller then tries to confirm it, all
+concurrently. Exactly one payment may end Completed, the toy must be Sold
+once, and no retry may create a duplicate row. Uses a throwaway SQLite file
+unless DATABASE_URL is set. Run from app/:
+
+    python -m benchmarks.trade_contention --buyers 300 --threads 32
+"""
+import argparse
+import atexit
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+if "DATABASE_URL" not in os.environ:
+    _db_dir = tempfile.mkdtemp(prefix="toy-bench-")
+    atexit.register(shutil.rmtree, _db_dir, ignore_errors=True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import Payment, Toy, User, db  # noqa: E402
+from search import create_search_index  # noqa: E402
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--buyers", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        create_search_index()
+        users = [
+            User(username=f"user{i}", email=f"user{i}@example.com", phone_number="0", password="x")
+            for i in range(args.buyers + 1)
+        ]
+        db.session.add_all(users)
+        db.session.flush()
+        toy = Toy(name="rare robot", age_group="6+", description="only one", condition="new",
+                  price=50, image_filename="robot.png", user_id=users[0].id)
+        db.session.add(toy)
+        db.session.commit()
+        toy_id = toy.id
+        tokens = [create_access_token(identity=str(user.id)) for user in users[1:]]
+        seller_token = create_access_token(identity=str(users[0].id))
+
+    def buy(token):
+        client = app.test_client()
+        headers = {"Authorization": "Bearer " + token, "Idempotency-Key": "checkout-1"}
+        first = client.post("/payments", json={"toy_id": toy_id, "amount": 50}, headers=headers)
+        retry = client.post("/payments", json={"toy_id": toy_id, "amount": 50}, headers=headers)
+        if first.status_code != 201:
+            return f"create {first.status_code}"
+        assert retry.json["id"] == first.json["id"], "retry created a duplicate payment"
+        completed = client.post(f"/payments/{first.json['id']}/complete",
+                                headers={"Authorization": "Bearer " + seller_token})
+        return f"complete {completed.status_code}"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        outcomes = Counter(pool.map(buy, tokens))
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        statuses = Counter(status for (status,) in db.session.query(Payment.status))
+        toy = db.session.get(Toy, toy_id)
+        payments = Payment.query.count()
+
+    print(f"{args.buyers} buyers, {args.threads} threads: {elapsed:.2f}s, "
+          f"{args.buyers * 3 / elapsed:,.0f} requests/s")
+    print(f"responses: {dict(outcomes)}")
+    print(f"payments: {payments} rows {dict(statuses)}; toy status {toy.status} version {toy.version}")
+    assert statuses["Completed"] == 1 and toy.status == "Sold" and toy.version == 1
+    assert payments <= args.buyers
+
+
+if __name__ == "__main__":
+    main()
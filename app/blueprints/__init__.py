@@ -0,0 +1 @@
+"""Route blueprints, registered by ``create_app``."""
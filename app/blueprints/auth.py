@@ -0,0 +1,73 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import create_access_token, get_jwt, jwt_required
+from sqlalchemy.exc import IntegrityError
+
+from extensions import password_hasher, token_blocklist, user_cache
+from models import db, User
+from password_hasher import HasherBusy
+from rate_limit import rate_limited
+
+bp = Blueprint("auth", __name__)
+
+
+@bp.app_errorhandler(HasherBusy)
+def handle_hasher_busy(error):
+    return jsonify({"error": "Server busy, please try again"}), 503, {"Retry-After": "1"}
+
+# ============================
+# 1️⃣ USER SIGNUP (REGISTER)
+# ============================
+@bp.route("/signup", methods=["POST"])
+@rate_limited("signup")
+def signup():
+    data = request.json
+    username = data.get("username")
+    email = data.get("email")
+    phone_number = data.get("phone_number")
+    password = data.get("password")
+
+    if user_cache.get_by_email(email):
+        return jsonify({"error": "Email already exists"}), 400
+    if user_cache.get_by_username(username):
+        return jsonify({"error": "Username already exists"}), 400
+
+    hashed_password = password_hasher.generate_password_hash(password)
+    new_user = User(username=username, email=email, phone_number=phone_number, password=hashed_password)
+
+    db.session.add(new_user)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Someone signed up with the same email or username while we hashed
+        db.session.rollback()
+        if User.query.filter_by(email=email).first():
+            return jsonify({"error": "Email already exists"}), 400
+        return jsonify({"error": "Username already exists"}), 400
+    return jsonify({"message": "User registered successfully!"}), 201
+
+# ============================
+# 2️⃣ USER LOGIN
+# ============================
+@bp.route("/login", methods=["POST"])
+@rate_limited("login")
+def login():
+    data = request.json
+    email = data.get("email")
+    password = data.get("password")
+
+    user = User.query.filter_by(email=email).first()
+    if user and password_hasher.check_password_hash(user.password, password):
+        access_token = create_access_token(identity=str(user.id))
+        return jsonify({"access_token": access_token, "user_id": user.id}), 200
+    return jsonify({"error": "Invalid email or password"}), 401
+
+# ============================
+# 🚪 USER LOGOUT
+# ============================
+@bp.route("/logout", methods=["POST"])
+@jwt_required()
+def logout():
+    # Revoke this token until it would have expired anyway
+    claims = get_jwt()
+    token_blocklist.add(claims["jti"], claims.get("exp"))
+    return jsonify({"message": "Logged out"}), 200
@@ -0,0 +1,167 @@
+from itertools import islice
+
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_socketio import emit, join_room, leave_room
+
+from extensions import message_writer, presence, socketio, user_cache
+from metrics import timed_event
+from models import db, Message
+from rate_limit import rate_limited_event
+from serializers import dumps, message, timestamp_text
+
+bp = Blueprint("chat", __name__)
+
+# ============================
+# 4️⃣ REAL-TIME CHAT (WebSockets)
+# ============================
+
+# Handle user joining a room
+@socketio.on("join")
+@timed_event("join")
+def handle_join(data):
+    username = data["user"]
+    room = data["room"]
+    
+    join_room(room)
+    user = user_cache.get_by_username(username)
+    if user:
+        presence.join(request.sid, room, user.id, user.username)
+    emit("message", {"user": "System", "text": f"{username} has joined the chat."}, room=room)
+
+def find_receiver(room, sender_id):
+    # Room members are tracked in memory (shared by every worker on the message queue);
+    # only a room nobody else has joined since startup needs the database, to find who
+    # the sender last chatted with there
+    receiver_id = presence.other_participant(room, sender_id)
+    if receiver_id is None:
+        last = (
+            Message.query
+            .with_entities(Message.sender_id, Message.receiver_id)
+            .filter(Message.room == room)
+            .order_by(Message.timestamp.desc(), Message.id.desc())
+            .first()
+        )
+        if last:
+            receiver_id = last.receiver_id if last.sender_id == sender_id else last.sender_id
+    return receiver_id
+
+# Handle sending messages
+@socketio.on("message")
+@timed_event("message")
+@rate_limited_event("message")
+def handle_message(data):
+    sender = data["user"]
+    message_text = data["message"]
+    room = data["room"]
+
+    sender_user = user_cache.get_by_username(sender)
+    if not sender_user:
+        return  # Don't store messages from unknown users
+
+    receiver_id = find_receiver(room, sender_user.id)
+    if receiver_id is None:
+        # messages.receiver_id is NOT NULL: refuse now rather than broadcast a
+        # message the writer would have to drop
+        emit("message", {"user": "System", "text": "Nobody else has joined this chat yet, so the message wasn't sent."})
+        return
+
+    # Emit the message back to all clients
+    emit("message", {"user": sender, "text": message_text, "room": room}, room=room)
+
+    # Queue for a batched insert instead of committing on the event loop
+    message_writer.submit(
+        message_text=message_text,
+        sender_id=sender_user.id,
+        receiver_id=receiver_id,
+        room=room # ✅ Store room in the database
+    )
+
+# Handle user leaving a room
+@socketio.on("leave")
+@timed_event("leave")
+def handle_leave(data):
+    username = data["user"]
+    room = data["room"]
+
+    leave_room(room)
+    presence.leave(request.sid, room)
+    emit("message", {"user": "System", "text": f"{username} has left the chat."}, room=room)
+
+# Drop a closed socket from every room it was in
+@socketio.on("disconnect")
+def handle_disconnect(*args):
+    for room, user_id in presence.disconnect(request.sid):
+        user = user_cache.get_by_id(user_id)
+        if user:
+            emit("message", {"user": "System", "text": f"{user.username} has left the chat."}, room=room)
+
+# Users currently connected to a room
+@bp.route("/rooms/<room>/participants", methods=["GET"])
+def get_participants(room):
+    participants = presence.participants(room)
+    return jsonify({"room": room, "participants": participants, "count": len(participants)}), 200
+
+# ============================
+# 5️⃣ Fetch messages from database
+# ============================
+
+MESSAGES_PAGE_SIZE = 100
+MESSAGES_MAX_PAGE_SIZE = 5000
+MESSAGES_STREAM_THRESHOLD = 500  # pages larger than this are streamed
+MESSAGES_STREAM_CHUNK = 500
+
+@bp.route("/messages/<room>", methods=["GET"])
+def get_messages(room):
+    # Cursor pagination: ?before=<oldest message id seen>&limit=<page size>
+    before = request.args.get("before", type=int)
+    limit = request.args.get("limit", MESSAGES_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MESSAGES_MAX_PAGE_SIZE))
+
+    # Newest `limit` message ids in the room, walked backwards along the (room, timestamp, id) index
+    window = Message.query.with_entities(Message.id).filter(Message.room == room)
+    if before is not None:
+        before_ts = db.session.query(Message.timestamp).filter(Message.id == before).scalar_subquery()
+        window = window.filter(db.or_(
+            Message.timestamp < before_ts,
+            db.and_(Message.timestamp == before_ts, Message.id < before),
+        ))
+    window = window.order_by(Message.timestamp.desc(), Message.id.desc()).limit(limit).subquery()
+
+    # The page oldest-first, timestamps already formatted by the database;
+    # sender usernames come from the user cache
+    history = (
+        db.session.query(
+            Message.id, Message.message_text, timestamp_text(Message.timestamp).label("timestamp"), Message.sender_id,
+        )
+        .join(window, window.c.id == Message.id)
+        .order_by(Message.timestamp, Message.id)
+    )
+
+    if limit <= MESSAGES_STREAM_THRESHOLD:
+        rows = history.all()
+        usernames = user_cache.usernames_for(row.sender_id for row in rows)
+        messages_data = [message(row, usernames) for row in rows]
+        next_before = messages_data[0]["id"] if len(messages_data) == limit else None
+        return {"messages": messages_data, "next_before": next_before}, 200
+
+    def generate():
+        count = 0
+        oldest_id = None
+        yield b'{"messages":['
+        rows = iter(history.yield_per(MESSAGES_STREAM_CHUNK))
+        while True:
+            chunk = list(islice(rows, MESSAGES_STREAM_CHUNK))
+            if not chunk:
+                break
+            usernames = user_cache.usernames_for(row.sender_id for row in chunk)
+            # One dumps per chunk, spliced in without its brackets
+            if count == 0:
+                oldest_id = chunk[0].id
+            else:
+                yield b","
+            yield dumps([message(row, usernames) for row in chunk])[1:-1]
+            count += len(chunk)
+        next_before = oldest_id if count == limit else None
+        yield b'],"next_before":' + dumps(next_before) + b"}"
+
+    return Response(stream_with_context(generate()), status=200, mimetype="application/json")
@@ -0,0 +1,46 @@
+import os
+
+from flask import Blueprint, request, jsonify, send_file
+from flask_jwt_extended import jwt_required
+
+from extensions import image_store
+from image_store import InvalidImage
+from serializers import thumbnail_url
+
+bp = Blueprint("images", __name__)
+
+# ============================
+# 🖼️ IMAGES
+# ============================
+IMAGE_MAX_AGE = 365 * 24 * 60 * 60  # content-addressed, so safe to cache forever
+
+@bp.route("/images", methods=["POST"])
+@jwt_required()
+def upload_image():
+    if "image" not in request.files:
+        return jsonify({"error": "No image uploaded"}), 400
+    try:
+        name = image_store.save(request.files["image"])
+    except InvalidImage as error:
+        return jsonify({"error": str(error)}), 422
+    return jsonify({"image_filename": name, "url": f"/images/{name}", "thumbnail": thumbnail_url(name)}), 201
+
+@bp.route("/images/<name>", methods=["GET"])
+def get_image(name):
+    if not image_store.is_stored_name(name):
+        return jsonify({"error": "Image not found"}), 404
+
+    path = image_store.path(name)
+    if os.path.exists(path):
+        response = send_file(path, conditional=True, etag=name, max_age=IMAGE_MAX_AGE)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    # Variant not generated yet: serve the original without letting it be cached as the variant
+    original = image_store.original_for(name)
+    if original is None:
+        return jsonify({"error": "Image not found"}), 404
+    response = send_file(image_store.path(original), conditional=True)
+    response.cache_control.no_cache = True
+    return response
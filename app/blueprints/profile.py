@@ -0,0 +1,21 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from models import db, User
+from serializers import user_profile
+
+bp = Blueprint("profile", __name__)
+
+# ============================
+# 5️⃣ PROFILE PAGE
+# ============================
+@bp.route('/profile', methods=['GET'])
+@jwt_required()
+def get_profile():
+    user_id = int(get_jwt_identity())
+    # The user and their toys in one LEFT OUTER JOIN instead of a lazy second query
+    user = db.session.get(User, user_id, options=[db.joinedload(User.toys)])
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    return jsonify(user_profile(user)), 200
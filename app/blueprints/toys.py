@@ -0,0 +1,176 @@
+import csv
+
+from flask import Blueprint, request, jsonify, Response
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from bulk_import import import_toys, iter_csv, iter_ndjson, missing_toy_fields
+from extensions import home_cache, similar_toys
+from models import db, Toy
+from rate_limit import rate_limited
+from search import FACETS, search_toys
+from serializers import dumps, toy_listing, toy_summary
+
+bp = Blueprint("toys", __name__)
+
+# ============================
+# 3️⃣ HOME PAGE (SHOW TOYS)
+# ============================
+HOME_PAGE_SIZE = 50
+HOME_MAX_PAGE_SIZE = 200
+
+# Serialized /home pages of available toys live in the app's home_cache for HOME_CACHE_TTL
+# seconds, and are cleared whenever this worker creates, sells or trades a toy
+@bp.route("/home", methods=["GET"])
+def home():
+    # Keyset pagination: ?after=<last toy id seen>&limit=<page size>
+    after = request.args.get("after", 0, type=int)
+    limit = request.args.get("limit", HOME_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, HOME_MAX_PAGE_SIZE))
+
+    cached = home_cache.get((after, limit))
+    if cached is None:
+        rows = (
+            Toy.query
+            .with_entities(Toy.id, Toy.name, Toy.price, Toy.image_filename)
+            .filter(Toy.status == "Available", Toy.id > after)
+            .order_by(Toy.id)
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        body = dumps([toy_summary(row) for row in rows])
+        headers = {"X-Next-Cursor": str(rows[-1].id)} if has_more else {}
+        cached = home_cache.set((after, limit), body, headers)
+
+    body, etag, headers = cached
+    response = Response(body, status=200, mimetype="application/json", headers=headers)
+    response.set_etag(etag)
+    # Weak match: compressed copies go out with W/"<etag>"
+    if request.if_none_match.contains_weak(etag):
+        response.status_code = 304
+        response.set_data(b"")
+    return response
+
+# ============================
+# 🔍 TOY SEARCH
+# ============================
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+@bp.route("/toys/search", methods=["GET"])
+def search():
+    # ?q=<text>&age_group=..&condition=..&min_price=..&max_price=..&after=<cursor>&limit=..
+    text = request.args.get("q", "").strip()
+    filters = {name: request.args[name] for name in FACETS if request.args.get(name)}
+    limit = request.args.get("limit", SEARCH_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, SEARCH_MAX_PAGE_SIZE))
+
+    try:
+        rows, next_cursor, facets = search_toys(
+            text=text,
+            filters=filters,
+            min_price=request.args.get("min_price", type=float),
+            max_price=request.args.get("max_price", type=float),
+            after=request.args.get("after"),
+            limit=limit,
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    toy_list = [toy_listing(row) for row in rows]
+    return jsonify({"toys": toy_list, "facets": facets, "next_cursor": next_cursor}), 200
+
+# ============================
+# 🤝 SIMILAR TOYS
+# ============================
+SIMILAR_PAGE_SIZE = 10
+
+@bp.route("/toys/<int:toy_id>/similar", methods=["GET"])
+def similar(toy_id):
+    limit = request.args.get("limit", SIMILAR_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, similar_toys.neighbours_kept))
+
+    if not similar_toys.ensure_loaded():
+        # First lookup in this worker: the index is loading in the background
+        return jsonify({"error": "Similar toys are still being indexed"}), 503, {"Retry-After": "5"}
+
+    neighbours = similar_toys.similar_to(toy_id)
+    if neighbours is None:
+        # Created by another worker since this one built its index
+        toy = db.session.get(Toy, toy_id)
+        if toy is None:
+            return jsonify({"error": "Toy not found"}), 404
+        similar_toys.add(toy)
+        neighbours = similar_toys.similar_to(toy_id)
+
+    # Only the neighbours' own rows, by primary key, to drop toys that are gone or sold
+    scores = {other_id: score for score, other_id in neighbours}
+    rows = (
+        Toy.query
+        .with_entities(Toy.id, Toy.name, Toy.price, Toy.image_filename, Toy.age_group, Toy.condition)
+        .filter(Toy.id.in_(scores), Toy.status == "Available")
+        .all()
+    )
+    rows.sort(key=lambda row: (-scores[row.id], row.id))
+    toy_list = [{**toy_listing(row), "score": round(scores[row.id], 4)} for row in rows[:limit]]
+    return jsonify({"toy_id": toy_id, "similar": toy_list}), 200
+
+# ============================
+# 🧸 CREATE TOYS
+# ============================
+@bp.route('/create-toy', methods=['POST'])
+@jwt_required()
+@rate_limited("create_toy", per_user=True)
+def create_toy():
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+
+    if missing_toy_fields(data):
+        return jsonify({"error": "Missing or invalid toy data"}), 422
+
+    toy = Toy(
+        name=data['name'],
+        age_group=data['age_group'],
+        description=data['description'],
+        condition=data['condition'],
+        price=data['price'],
+        image_filename=data['image_filename'],
+        user_id=user_id
+    )
+    db.session.add(toy)
+    db.session.commit()
+    home_cache.clear()
+    similar_toys.add(toy)
+    return jsonify({"message": "Toy created successfully"}), 201
+
+# Accepts a JSON array, NDJSON (application/x-ndjson) or CSV (text/csv, or a
+# multipart "file" upload) with the same fields as /create-toy
+@bp.route('/toys/bulk', methods=['POST'])
+@jwt_required()
+@rate_limited("bulk_toys", per_user=True)
+def bulk_create_toys():
+    user_id = int(get_jwt_identity())
+
+    if "file" in request.files:
+        records = iter_csv(request.files["file"].stream)
+    elif request.mimetype == "application/x-ndjson":
+        records = iter_ndjson(request.stream)
+    elif request.mimetype == "text/csv":
+        records = iter_csv(request.stream)
+    else:
+        records = request.get_json(silent=True)
+        if not isinstance(records, list):
+            return jsonify({"error": "Expected a JSON array of toys"}), 400
+
+    try:
+        created, errors = import_toys(records, user_id)
+    except (csv.Error, UnicodeDecodeError):
+        return jsonify({"error": "Could not parse upload"}), 400
+
+    if created:
+        home_cache.clear()
+        similar_toys.catch_up()
+    status = 201 if not errors else 207 if created else 422
+    return jsonify({"created": created, "errors": errors}), status
+
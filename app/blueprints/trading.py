@@ -0,0 +1,95 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+import serializers
+import trades
+from extensions import home_cache
+from models import db
+from trades import TradeError
+
+bp = Blueprint("trading", __name__)
+
+# ============================
+# 💳 PAYMENTS & EXCHANGES
+# ============================
+# Create calls honour an Idempotency-Key header: retries return the original row
+
+@bp.app_errorhandler(TradeError)
+def handle_trade_error(error):
+    db.session.rollback()
+    return jsonify({"error": error.message}), error.status_code
+
+@bp.route("/payments", methods=["POST"])
+@jwt_required()
+def create_payment():
+    user_id = int(get_jwt_identity())
+    data = request.get_json(silent=True) or {}
+    try:
+        toy_id = int(data["toy_id"])
+        amount = float(data["amount"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "toy_id and amount are required"}), 422
+    if amount <= 0:
+        return jsonify({"error": "Amount must be positive"}), 422
+
+    payment, created = trades.create_payment(user_id, toy_id, amount, request.headers.get("Idempotency-Key"))
+    return jsonify(serializers.payment(payment)), 201 if created else 200
+
+@bp.route("/payments", methods=["GET"])
+@jwt_required()
+def list_payments():
+    payments = trades.list_payments(int(get_jwt_identity()))
+    return jsonify({"payments": [serializers.payment(payment) for payment in payments]}), 200
+
+@bp.route("/payments/<int:payment_id>/complete", methods=["POST"])
+@jwt_required()
+def complete_payment(payment_id):
+    payment = trades.complete_payment(payment_id, int(get_jwt_identity()))
+    home_cache.clear()  # the toy is sold and leaves /home
+    return jsonify(serializers.payment(payment)), 200
+
+@bp.route("/payments/<int:payment_id>/cancel", methods=["POST"])
+@jwt_required()
+def cancel_payment(payment_id):
+    payment = trades.cancel_payment(payment_id, int(get_jwt_identity()))
+    return jsonify(serializers.payment(payment)), 200
+
+@bp.route("/exchanges", methods=["POST"])
+@jwt_required()
+def create_exchange():
+    user_id = int(get_jwt_identity())
+    data = request.get_json(silent=True) or {}
+    try:
+        buyer_toy_id = int(data["buyer_toy_id"])
+        seller_toy_id = int(data["seller_toy_id"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "buyer_toy_id and seller_toy_id are required"}), 422
+
+    exchange, created = trades.create_exchange(
+        user_id, buyer_toy_id, seller_toy_id, request.headers.get("Idempotency-Key"))
+    return jsonify(serializers.exchange(exchange)), 201 if created else 200
+
+@bp.route("/exchanges", methods=["GET"])
+@jwt_required()
+def list_exchanges():
+    exchanges = trades.list_exchanges(int(get_jwt_identity()))
+    return jsonify({"exchanges": [serializers.exchange(exchange) for exchange in exchanges]}), 200
+
+@bp.route("/exchanges/<int:exchange_id>/accept", methods=["POST"])
+@jwt_required()
+def accept_exchange(exchange_id):
+    exchange = trades.accept_exchange(exchange_id, int(get_jwt_identity()))
+    home_cache.clear()  # both toys are traded and leave /home
+    return jsonify(serializers.exchange(exchange)), 200
+
+@bp.route("/exchanges/<int:exchange_id>/reject", methods=["POST"])
+@jwt_required()
+def reject_exchange(exchange_id):
+    exchange = trades.close_exchange(exchange_id, int(get_jwt_identity()), "Rejected")
+    return jsonify(serializers.exchange(exchange)), 200
+
+@bp.route("/exchanges/<int:exchange_id>/cancel", methods=["POST"])
+@jwt_required()
+def cancel_exchange(exchange_id):
+    exchange = trades.close_exchange(exchange_id, int(get_jwt_identity()), "Cancelled")
+    return jsonify(serializers.exchange(exchange)), 200
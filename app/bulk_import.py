@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import db, Toy
+
+TOY_REQUIRED_FIELDS = ["name", "age_group", "description", "condition", "price", "image_filename"]
+BULK_CHUNK_SIZE = 500
+
+
+def missing_toy_fields(data):
+    """Names of required toy fields that are absent or empty in ``data``."""
+    if not isinstance(data, dict):
+        return list(TOY_REQUIRED_FIELDS)
+    return [field for field in TOY_REQUIRED_FIELDS if field not in data or not data[field]]
+
+
+def toy_row(data, user_id):
+    """Validate one record and return the column values to insert.
+
+    Raises ``ValueError`` with a message suitable for the per-row error list.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a toy object")
+    missing = missing_toy_fields(data)
+    if missing:
+        raise ValueError("Missing or invalid fields: " + ", ".join(missing))
+    try:
+        price = float(data["price"])
+    except (TypeError, ValueError):
+        raise ValueError("Invalid price")
+    return {
+        "name": data["name"],
+        "age_group": data["age_group"],
+        "description": data["description"],
+        "condition": data["condition"],
+        "price": price,
+        "image_filename": data["image_filename"],
+        "user_id": user_id,
+    }
+
+
+def iter_ndjson(stream):
+    for line in io.TextIOWrapper(stream, encoding="utf-8"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def iter_csv(stream):
+    yield from csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+
+
+def import_toys(records, user_id, chunk_size=BULK_CHUNK_SIZE):
+    """Insert valid records in executemany chunks, one transaction per chunk.
+
+    Returns ``(created, errors)`` where ``errors`` lists ``{"row", "error"}``
+    for every record that was rejected, rows numbered from 0.
+    """
+    created = 0
+    errors = []
+    chunk = []
+    chunk_rows = []
+
+    def flush():
+        nonlocal created
+        try:
+            db.session.execute(insert(Toy), chunk)
+            db.session.commit()
+            created += len(chunk)
+        except SQLAlchemyError as exc:
+            db.session.rollback()
+            errors.extend({"row": row, "error": f"Insert failed: {exc.__class__.__name__}"} for row in chunk_rows)
+        chunk.clear()
+        chunk_rows.clear()
+
+    for index, record in enumerate(records):
+        try:
+            chunk.append(toy_row(record, user_id))
+            chunk_rows.append(index)
+        except ValueError as exc:
+            errors.append({"row": index, "error": str(exc)})
+            continue
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return created, errors
@@ -0,0 +1,47 @@
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+class ResponseCache:
+    """Bounded LRU of serialized response bodies and their ETags.
+
+    Entries are keyed by whatever identifies a page (route parameters) and
+    hold the exact bytes sent to the client, so a hit skips both the query
+    and the JSON encoding. Entries expire after ``ttl`` seconds, which bounds
+    how stale a page can be in workers that didn't see the write that
+    cleared the cache in another.
+    """
+
+    def __init__(self, maxsize=256, ttl=5):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (entry, expires_at)
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            entry, expires_at = cached
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, body, headers=None):
+        etag = hashlib.sha1(body).hexdigest()
+        entry = (body, etag, headers or {})
+        with self._lock:
+            self._entries[key] = (entry, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,131 @@
+"""Response compression negotiated from Accept-Encoding.
+
+``Compressor(app)`` compresses JSON and text responses of at least
+``COMPRESS_MIN_SIZE`` bytes with brotli (when the ``brotli`` package is
+installed and the client accepts ``br``) or gzip. Streamed responses, such
+as long /messages pages, are gzipped chunk by chunk. Bodies with a strong
+ETag (the cached /home pages) are compressed once and kept in a small LRU
+keyed by ETag; their ETag turns weak because the bytes on the wire differ
+from the uncompressed ones.
+"""
+import zlib
+from collections import OrderedDict
+from threading import Lock
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/plain", "text/csv", "text/html"}
+GZIP_WBITS = 31  # zlib with a gzip header and trailer
+
+
+class Compressor:
+    def __init__(self, app=None, cache_size=256):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # (etag, encoding) -> compressed body
+        self._lock = Lock()
+
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cache_hits = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("COMPRESS_ENABLED", True)
+        self.min_size = app.config.get("COMPRESS_MIN_SIZE", 1024)
+        self.gzip_level = app.config.get("COMPRESS_GZIP_LEVEL", 6)
+        self.brotli_quality = app.config.get("COMPRESS_BROTLI_QUALITY", 4)
+        self.encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+        app.after_request(self.compress)
+        app.extensions["compressor"] = self
+
+    def compress(self, response):
+        if (
+            not self.enabled
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or response.direct_passthrough
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            if not request.accept_encodings["gzip"]:
+                return response
+            response.response = self._gzip_stream(response.response)
+            response.headers["Content-Encoding"] = "gzip"
+            response.headers.pop("Content-Length", None)
+            return response
+
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+        etag, weak = response.get_etag()
+        key = (etag, encoding) if etag and not weak else None
+        compressed = self._cached(key)
+        if compressed is None:
+            compressed = self._compress(body, encoding)
+            if key is not None:
+                self._store(key, compressed)
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            response.set_etag(etag, weak=True)
+        self.compressed += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        return response
+
+    def stats(self):
+        return {
+            "compressed": self.compressed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "cache_hits": self.cache_hits,
+        }
+
+    def _compress(self, body, encoding):
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, GZIP_WBITS)
+        return compressor.compress(body) + compressor.flush()
+
+    def _gzip_stream(self, chunks):
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, GZIP_WBITS)
+        try:
+            for chunk in chunks:
+                data = compressor.compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+                if data:
+                    yield data
+            yield compressor.flush()
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+    def _cached(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return compressed
+
+    def _store(self, key, compressed):
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -0,0 +1,79 @@
+"""Settings for ``create_app``, one class per environment.
+
+``FLASK_CONFIG`` picks ``development`` (the default), ``testing`` or
+``production``. Each setting can still be overridden by its own environment
+variable, and ``create_app`` also accepts a dict of overrides.
+"""
+import os
+
+from database import database_url
+
+
+class Config:
+    SQLALCHEMY_DATABASE_URI = database_url()  # DATABASE_URL, defaults to the local SQLite file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "supersecretkey")  # Change in production
+    JWT_VERIFY_CACHE_SIZE = int(os.environ.get("JWT_VERIFY_CACHE_SIZE", 10000))  # verified tokens kept in memory
+    JWT_VERIFY_CACHE_TTL = int(os.environ.get("JWT_VERIFY_CACHE_TTL", 300))
+    JWT_BLOCKLIST_MAXSIZE = int(os.environ.get("JWT_BLOCKLIST_MAXSIZE", 100000))  # revoked tokens kept until expiry
+    BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))  # bcrypt work factor
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 64))
+    # Seconds a worker serves a cached /home page; other workers' new toys show up within this
+    HOME_CACHE_TTL = float(os.environ.get("HOME_CACHE_TTL", 5))
+    SLOW_QUERY_MS = int(os.environ.get("SLOW_QUERY_MS", 200))
+    ENABLE_PROFILER = os.environ.get("ENABLE_PROFILER") == "1"  # exposes /metrics/profiler/*
+    IMAGE_STORAGE_DIR = os.environ.get("IMAGE_STORAGE_DIR")  # defaults to instance/images
+    THUMBNAIL_SIZE = int(os.environ.get("THUMBNAIL_SIZE", 320))
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE") == "1"  # let nginx/Apache send image files
+    # Written by `flask rebuild-similar-toys`, defaults to instance/similar_toys.pickle
+    SIMILAR_TOYS_SNAPSHOT = os.environ.get("SIMILAR_TOYS_SNAPSHOT")
+    # Shared queue so several workers see the same rooms, e.g. redis://localhost:6379/0 or local://127.0.0.1:5055
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE")
+    SOCKETIO_ASYNC_MODE = os.environ.get("SOCKETIO_ASYNC_MODE")  # eventlet when installed, or "threading"
+    # Reverse proxies (nginx, a load balancer) in front of the app: their X-Forwarded-For/-Proto
+    # entries are trusted, so request.remote_addr is the client's IP. Leave 0 when clients connect directly.
+    TRUSTED_PROXIES = int(os.environ.get("TRUSTED_PROXIES", 0))
+    RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMIT_STORAGE_URL = os.environ.get("RATE_LIMIT_STORAGE_URL")  # e.g. redis://localhost:6379/1, per-process when unset
+    # Token buckets per route/event, overridable like RATE_LIMITS="login=5/minute,message=20/second"
+    RATE_LIMITS = dict(
+        {
+            "login": "10/minute", "signup": "5/minute", "create_toy": "30/minute",
+            "bulk_toys": "10/hour",  # each call may create thousands of toys
+            "message": "10/second",
+        },
+        **dict(item.split("=", 1) for item in os.environ.get("RATE_LIMITS", "").split(",") if item),
+    )
+    # gzip (or brotli, when installed) for JSON/text responses at least this many bytes
+    COMPRESS_ENABLED = os.environ.get("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get("COMPRESS_BROTLI_QUALITY", 4))
+    # Flask-Migrate is only imported for the `flask db` commands unless this is set
+    ENABLE_MIGRATE = os.environ.get("ENABLE_MIGRATE") == "1"
+
+
+class DevelopmentConfig(Config):
+    """Local runs: the SQLite file and the defaults above."""
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get("TEST_DATABASE_URL", "sqlite://")
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 2
+    SOCKETIO_MESSAGE_QUEUE = None
+    SOCKETIO_ASYNC_MODE = "threading"
+    RATE_LIMIT_ENABLED = False
+
+
+class ProductionConfig(Config):
+    ENABLE_PROFILER = False
+
+
+configs = {
+    "development": DevelopmentConfig,
+    "testing": TestingConfig,
+    "production": ProductionConfig,
+}
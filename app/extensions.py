@@ -0,0 +1,32 @@
+"""Extension objects shared by the blueprints.
+
+The Flask extensions are created unbound here and bound by ``create_app``.
+The app's own helpers (caches, the chat writer, the hashing pool, ...) keep
+per-app state, so every app builds its own and registers it in
+``app.extensions``; the names below are proxies to the current app's copy.
+"""
+from flask import current_app
+from flask_cors import CORS
+from flask_socketio import SocketIO
+from werkzeug.local import LocalProxy
+
+from jwt_cache import CachingJWTManager
+
+jwt = CachingJWTManager()
+# Cross-origin frontends need to read the /home cursor and ETag headers
+cors = CORS(expose_headers=["X-Next-Cursor", "ETag"])
+socketio = SocketIO()
+
+
+def _current(name):
+    return LocalProxy(lambda: current_app.extensions[name])
+
+
+home_cache = _current("home_cache")
+user_cache = _current("user_cache")
+message_writer = _current("message_writer")
+password_hasher = _current("password_hasher")
+image_store = _current("image_store")
+presence = _current("presence")
+token_blocklist = _current("token_blocklist")
+similar_toys = _current("similar_toys")
@@ -0,0 +1,108 @@
+"""Content-addressed image storage with background thumbnail generation.
+
+Uploads are stored once under the SHA-256 of their bytes, sharded by the
+first two hex digits (``<IMAGE_STORAGE_DIR>/ab/abcd...ef.png``), so the same
+photo uploaded twice costs nothing and every URL can be cached forever.
+After an upload a worker pool writes a ``<hash>.thumb.webp`` thumbnail and
+a full-size ``<hash>.webp``; Pillow is optional and without it only the
+original is served.
+"""
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Pillow is imported on the first upload, not at startup
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp"}
+STORED_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})(?P<variant>\.thumb)?\.(?P<ext>[a-z]+)$")
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+class ImageStore:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.root = app.config.get("IMAGE_STORAGE_DIR") or os.path.join(app.instance_path, "images")
+        self.max_bytes = app.config.get("IMAGE_MAX_BYTES", 10 * 1024 * 1024)
+        self.thumbnail_size = app.config.get("THUMBNAIL_SIZE", 320)
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get("IMAGE_WORKERS", 2), thread_name_prefix="image-variants")
+        app.extensions["image_store"] = self
+
+    def save(self, file_storage):
+        """Store an uploaded file and queue its variants; returns the stored name."""
+        ext = os.path.splitext(file_storage.filename or "")[1].lower().lstrip(".")
+        if ext not in ALLOWED_EXTENSIONS:
+            raise InvalidImage("Unsupported image type")
+        data = file_storage.read(self.max_bytes + 1)
+        if not data:
+            raise InvalidImage("Empty upload")
+        if len(data) > self.max_bytes:
+            raise InvalidImage("Image too large")
+
+        name = f"{hashlib.sha256(data).hexdigest()}.{ext}"
+        path = self.path(name)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+            if HAS_PILLOW:
+                self._executor.submit(self._make_variants, name)
+        return name
+
+    def path(self, name):
+        return os.path.join(self.root, name[:2], name)
+
+    @staticmethod
+    def is_stored_name(name):
+        return bool(name) and STORED_NAME.match(name) is not None
+
+    @staticmethod
+    def thumbnail_name(name):
+        return STORED_NAME.match(name).group("digest") + ".thumb.webp"
+
+    def original_for(self, name):
+        """Name of the uploaded original behind any stored name, if it exists."""
+        digest = STORED_NAME.match(name).group("digest")
+        shard = os.path.join(self.root, digest[:2])
+        for ext in ALLOWED_EXTENSIONS:
+            candidate = f"{digest}.{ext}"
+            if os.path.exists(os.path.join(shard, candidate)):
+                return candidate
+        return None
+
+    def _make_variants(self, name):
+        from PIL import Image
+
+        digest = STORED_NAME.match(name).group("digest")
+        try:
+            with Image.open(self.path(name)) as image:
+                image.load()
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+                self._write_webp(image, f"{digest}.webp")
+                image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+                self._write_webp(image, f"{digest}.thumb.webp")
+        except Exception:
+            logger.exception("Could not build variants for %s", name)
+
+    def _write_webp(self, image, name):
+        path = self.path(name)
+        if os.path.exists(path):
+            return
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        image.save(tmp_path, format="WEBP", quality=80, method=4)
+        os.replace(tmp_path, path)
@@ -0,0 +1,139 @@
+"""Verified-token cache and revocation blocklist for Flask-JWT-Extended.
+
+``CachingJWTManager`` remembers the claims of every token it has verified,
+keyed by the SHA-256 of the token, so a client sending the same bearer
+token again skips the signature check and JSON decode. Entries live until
+the token expires or ``JWT_VERIFY_CACHE_TTL`` seconds pass, whichever is
+first. The blocklist is still checked on every request.
+
+``MemoryBlocklist`` holds revoked token ids (``jti``) until the tokens would
+have expired anyway. It is per process; a shared store only needs the same
+``add`` and ``__contains__`` methods.
+"""
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from flask import current_app
+from flask_jwt_extended import JWTManager
+
+logger = logging.getLogger(__name__)
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of token hash -> verified claims."""
+
+    def __init__(self, maxsize=10000, ttl=300, leeway=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.leeway = leeway
+        self._entries = OrderedDict()  # token hash -> (claims, expires_at)
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, claims):
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, claims["exp"] + self.leeway)
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class MemoryBlocklist:
+    """Revoked token ids, each kept until its token's own expiry.
+
+    At ``maxsize`` expired ids are purged first; if it is still full the
+    revocation closest to expiring is dropped (and counted), since every
+    access token has the same lifetime.
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._revoked = OrderedDict()  # jti -> expires_at, oldest first
+        self._lock = Lock()
+        self.evictions = 0
+
+    def add(self, jti, expires_at=None):
+        with self._lock:
+            self._revoked[jti] = expires_at if expires_at is not None else float("inf")
+            if len(self._revoked) > self.maxsize:
+                self._purge()
+
+    def __contains__(self, jti):
+        with self._lock:
+            expires_at = self._revoked.get(jti)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self._revoked[jti]
+                return False
+            return True
+
+    def stats(self):
+        return {"size": len(self._revoked), "evictions": self.evictions}
+
+    def _purge(self):
+        # Caller holds the lock
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[jti]
+        while len(self._revoked) > self.maxsize:
+            jti, _ = min(self._revoked.items(), key=lambda item: item[1])
+            del self._revoked[jti]
+            self.evictions += 1
+            logger.warning("Token blocklist full, dropped revocation of %s", jti)
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that reuses earlier verifications and honours the blocklist.
+
+    The cache and blocklist belong to the app (``app.extensions["token_cache"]``
+    and ``["token_blocklist"]``), so apps with different secrets never share
+    verified tokens.
+    """
+
+    def __init__(self, app=None, **kwargs):
+        super().__init__(app, **kwargs)
+        self.token_in_blocklist_loader(self._is_revoked)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        cache = current_app.extensions.get("token_cache")
+        if cache is None or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        key = hashlib.sha256(encoded_token.encode("utf-8")).digest()
+        claims = cache.get(key)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token)
+            cache.set(key, claims)
+        return dict(claims)
+
+    @staticmethod
+    def _is_revoked(jwt_header, jwt_payload):
+        blocklist = current_app.extensions.get("token_blocklist")
+        return blocklist is not None and jwt_payload.get("jti") in blocklist
@@ -0,0 +1,134 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import db, Message
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriter:
+    """Write-behind buffer for chat messages.
+
+    Socket handlers call ``submit`` and return straight away; a background
+    thread inserts the buffered rows in bulk once ``batch_size`` rows are
+    waiting or ``flush_interval`` seconds have passed. If the backlog reaches
+    ``max_backlog`` the submitting caller flushes inline, so memory stays
+    bounded and no message is dropped.
+    """
+
+    def __init__(self, app=None, batch_size=100, flush_interval=0.5, max_backlog=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backlog = max_backlog
+
+        self._pending = deque()
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._stopping = False
+        self._thread = None
+
+        self.flushed_rows = 0
+        self.flush_count = 0
+        self.failed_rows = 0
+        self.overflow_count = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["message_writer"] = self
+        atexit.register(self.stop)
+
+    def submit(self, message_text, sender_id, receiver_id, room):
+        self._pending.append({
+            "message_text": message_text,
+            "sender_id": sender_id,
+            "receiver_id": receiver_id,
+            "room": room,
+            "timestamp": datetime.now(timezone.utc).replace(tzinfo=None),
+        })
+        if len(self._pending) >= self.max_backlog:
+            self.overflow_count += 1
+            self.flush()
+            return
+        self._ensure_started()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Insert everything currently buffered. Safe to call from any thread."""
+        with self._flush_lock:
+            while self._pending:
+                rows = []
+                while self._pending and len(rows) < self.batch_size:
+                    rows.append(self._pending.popleft())
+                self._write(rows)
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self):
+        return {
+            "queue_depth": len(self._pending),
+            "flushed_rows": self.flushed_rows,
+            "flush_count": self.flush_count,
+            "failed_rows": self.failed_rows,
+            "overflow_count": self.overflow_count,
+            "last_flush_seconds": self.last_flush_seconds,
+            "max_flush_seconds": self.max_flush_seconds,
+            "total_flush_seconds": self.total_flush_seconds,
+        }
+
+    def _ensure_started(self):
+        if self._thread is None and not self._stopping:
+            self._thread = threading.Thread(target=self._run, name="message-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Chat message flush failed")
+
+    def _write(self, rows):
+        started = time.perf_counter()
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(Message), rows)
+                db.session.commit()
+                self.flushed_rows += len(rows)
+            except SQLAlchemyError:
+                # One bad row shouldn't cost the whole batch: retry them one by one
+                db.session.rollback()
+                for row in rows:
+                    try:
+                        db.session.execute(insert(Message), [row])
+                        db.session.commit()
+                        self.flushed_rows += 1
+                    except SQLAlchemyError:
+                        db.session.rollback()
+                        self.failed_rows += 1
+                        logger.exception("Dropping chat message for room %s", row["room"])
+        elapsed = time.perf_counter() - started
+        self.flush_count += 1
+        self.last_flush_seconds = elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        self.total_flush_seconds += elapsed
@@ -0,0 +1,245 @@
+"""Request, socket event and SQL metrics, served in Prometheus text format.
+
+``Metrics(app)`` times every HTTP request by route and counts the SQL
+statements each one runs (via events on the app's engines). Socket.IO
+handlers opt in with ``@timed_event("name")``. Statements slower
+than ``SLOW_QUERY_MS`` are logged. Other components can export their own
+counters with ``add_collector``. Everything is served from ``/metrics``.
+
+With ``ENABLE_PROFILER`` set, ``POST /metrics/profiler/start`` and
+``POST /metrics/profiler/stop`` run a sampling profiler and return
+collapsed stacks (flamegraph.pl / speedscope input).
+"""
+import functools
+import logging
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import Response, current_app, g, has_app_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250)
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+def _series(name, labels):
+    return f"{name}{{{labels}}}" if labels else name
+
+
+def timed_event(name):
+    """Decorator recording latency and SQL count for a Socket.IO handler."""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            metrics = current_app.extensions.get("metrics")
+            if metrics is None:
+                return handler(*args, **kwargs)
+            metrics._start_timer()
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - g.metrics_started
+                metrics.event_latency.observe((name,), elapsed)
+                metrics.event_sql_queries.observe((name,), g.sql_queries)
+        return wrapper
+    return decorator
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for label_values, series in items:
+            labels = _labels(self.label_names, label_values)
+            prefix = labels + "," if labels else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-2]}')
+            lines.append(f"{_series(self.name + '_count', labels)} {series[-2]}")
+            lines.append(f"{_series(self.name + '_sum', labels)} {series[-1]}")
+        return lines
+
+
+class CounterMetric:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, label_values=(), amount=1):
+        with self._lock:
+            self._values[label_values] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{_series(self.name, _labels(self.label_names, label_values))} {value}")
+        return lines
+
+
+class SamplingProfiler:
+    """Samples every thread's stack on an interval and counts collapsed stacks."""
+
+    def __init__(self):
+        self.stacks = Counter()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, interval=0.005):
+        if self.running:
+            return
+        self.stacks.clear()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return ""
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def _run(self, interval):
+        own_id = threading.get_ident()
+        while not self._stopping.wait(interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+
+
+class Metrics:
+    def __init__(self, app=None, db=None):
+        self.http_latency = Histogram(
+            "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"), LATENCY_BUCKETS)
+        self.http_requests = CounterMetric(
+            "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+        self.http_sql_queries = Histogram(
+            "http_request_sql_queries", "SQL statements per HTTP request.", ("method", "route"), QUERY_COUNT_BUCKETS)
+        self.http_sql_seconds = Histogram(
+            "http_request_sql_seconds", "Time spent in SQL per HTTP request.", ("method", "route"), LATENCY_BUCKETS)
+        self.event_latency = Histogram(
+            "socketio_event_duration_seconds", "Socket.IO handler latency by event.", ("event",), LATENCY_BUCKETS)
+        self.event_sql_queries = Histogram(
+            "socketio_event_sql_queries", "SQL statements per Socket.IO event.", ("event",), QUERY_COUNT_BUCKETS)
+        self.sql_latency = Histogram(
+            "sql_query_duration_seconds", "Latency of every SQL statement.", (), LATENCY_BUCKETS)
+        self.slow_queries = CounterMetric(
+            "sql_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.")
+        self.collectors = {}
+        self.profiler = SamplingProfiler()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.slow_query_seconds = app.config.get("SLOW_QUERY_MS", 200) / 1000
+        app.before_request(self._start_timer)
+        app.after_request(self._record_request)
+        app.add_url_rule("/metrics", "metrics", self.render_view, methods=["GET"])
+        if app.config.get("ENABLE_PROFILER"):
+            app.add_url_rule("/metrics/profiler/start", "profiler_start", self.profiler_start_view, methods=["POST"])
+            app.add_url_rule("/metrics/profiler/stop", "profiler_stop", self.profiler_stop_view, methods=["POST"])
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        app.extensions["metrics"] = self
+
+    def add_collector(self, prefix, stats):
+        """Export every numeric value of ``stats()`` as a ``<prefix>_<key>`` gauge."""
+        self.collectors[prefix] = stats
+
+    def render(self):
+        lines = []
+        for metric in (
+            self.http_latency, self.http_requests, self.http_sql_queries, self.http_sql_seconds,
+            self.event_latency, self.event_sql_queries, self.sql_latency, self.slow_queries,
+        ):
+            lines.extend(metric.render())
+        for prefix, stats in sorted(self.collectors.items()):
+            for key, value in sorted(stats().items()):
+                if isinstance(value, (int, float)):
+                    lines.append(f"# TYPE {prefix}_{key} gauge")
+                    lines.append(f"{prefix}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    def render_view(self):
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+    def profiler_start_view(self):
+        self.profiler.start(request.args.get("interval", 0.005, type=float))
+        return {"profiling": True}, 200
+
+    def profiler_stop_view(self):
+        return Response(self.profiler.stop(), mimetype="text/plain")
+
+    def _start_timer(self):
+        g.metrics_started = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_seconds = 0.0
+
+    def _record_request(self, response):
+        if "metrics_started" in g:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            labels = (request.method, route)
+            self.http_latency.observe(labels, time.perf_counter() - g.metrics_started)
+            self.http_requests.inc((request.method, route, str(response.status_code)))
+            self.http_sql_queries.observe(labels, g.sql_queries)
+            self.http_sql_seconds.observe(labels, g.sql_seconds)
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        self.sql_latency.observe((), elapsed)
+        if elapsed >= self.slow_query_seconds:
+            self.slow_queries.inc()
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
+        if has_app_context() and "sql_queries" in g:
+            g.sql_queries += 1
+            g.sql_seconds += elapsed
@@ -0,0 +1,55 @@
+"""Add toy facet indexes and the toys_fts full-text index
+
+Revision ID: a5c9e07f3b14
+Revises: 8e3f51c0d6a2
+Create Date: 2026-10-18 11:20:55.274019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c9e07f3b14'
+down_revision = '8e3f51c0d6a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('toys', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_toys_age_group'), ['age_group'], unique=False)
+        batch_op.create_index(batch_op.f('ix_toys_condition'), ['condition'], unique=False)
+        batch_op.create_index(batch_op.f('ix_toys_price'), ['price'], unique=False)
+
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    # External-content FTS5 table kept in sync with toys by triggers
+    op.execute("""CREATE VIRTUAL TABLE toys_fts USING fts5(
+        name, description, content='toys', content_rowid='id'
+    )""")
+    op.execute("""CREATE TRIGGER toys_fts_insert AFTER INSERT ON toys BEGIN
+        INSERT INTO toys_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""")
+    op.execute("""CREATE TRIGGER toys_fts_delete AFTER DELETE ON toys BEGIN
+        INSERT INTO toys_fts(toys_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""")
+    op.execute("""CREATE TRIGGER toys_fts_update AFTER UPDATE OF name, description ON toys BEGIN
+        INSERT INTO toys_fts(toys_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO toys_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""")
+    op.execute("INSERT INTO toys_fts(toys_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS toys_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS toys_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS toys_fts_insert")
+        op.execute("DROP TABLE IF EXISTS toys_fts")
+
+    with op.batch_alter_table('toys', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_toys_price'))
+        batch_op.drop_index(batch_op.f('ix_toys_condition'))
+        batch_op.drop_index(batch_op.f('ix_toys_age_group'))
@@ -7,8 +7,8 @@ class User(db.Model):
     __tablename__ = "users"
 
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), nullable=False)
-    email = db.Column(db.String(80), nullable=False)
+    username = db.Column(db.String(80), nullable=False, unique=True, index=True)
+    email = db.Column(db.String(80), nullable=False, unique=True, index=True)
     phone_number = db.Column(db.String(20), nullable=False)
     password = db.Column(db.String(80), nullable=False)
 
@@ -19,12 +19,14 @@ class Toy(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
-    age_group = db.Column(db.String(50), nullable=False)
+    age_group = db.Column(db.String(50), nullable=False, index=True)
     description = db.Column(db.Text, nullable=False)
-    condition = db.Column(db.String(50), nullable=False)
-    price = db.Column(db.Float, nullable=False)
+    condition = db.Column(db.String(50), nullable=False, index=True)
+    price = db.Column(db.Float, nullable=False, index=True)
     image_filename = db.Column(db.String(300), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    status = db.Column(db.String(50), nullable=False, default="Available", server_default="Available")  # Available, Sold, Traded
+    version = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # bumped on every sale/trade
     
     user = db.relationship('User', back_populates='toys')
 
@@ -44,6 +46,9 @@ class Message(db.Model):
     sender = db.relationship('User', foreign_keys=[sender_id], backref='sent_messages')
     receiver  = db.relationship('User', foreign_keys=[receiver_id], backref='received_messages')
 
+    # Serves room history pages newest-first without a sort step
+    __table_args__ = (db.Index("ix_messages_room_timestamp_id", "room", "timestamp", "id"),)
+
 class Payment(db.Model):
     __tablename__ = 'payments'
 
@@ -51,12 +56,15 @@ class Payment(db.Model):
     amount = db.Column(db.Float, nullable=False)
     timestamp = db.Column(db.DateTime, server_default=db.func.now())
     status = db.Column(db.String(50), default="Pending")
-    buyer_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    toy_id = db.Column(db.Integer, db.ForeignKey("toys.id"), nullable=False)
+    buyer_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    toy_id = db.Column(db.Integer, db.ForeignKey("toys.id"), nullable=False, index=True)
+    idempotency_key = db.Column(db.String(100))
 
     buyer = db.relationship('User', backref='payments')
     toy = db.relationship('Toy', backref='toy_payments')
 
+    __table_args__ = (db.UniqueConstraint("buyer_id", "idempotency_key", name="uq_payments_buyer_idempotency_key"),)
+
 
 class Exchange(db.Model):
     __tablename__ = "exchanges"
@@ -64,8 +72,13 @@ class Exchange(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     status = db.Column(db.String(50), default="Pending")
     timestamp = db.Column(db.DateTime, server_default=db.func.now())
-    buyer_toy_id =db.Column(db.Integer, db.ForeignKey("toys.id"))  # Toy offered by buyer
-    seller_toy_id = db.Column(db.Integer, db.ForeignKey("toys.id"))  # Toy offered by seller
+    buyer_toy_id =db.Column(db.Integer, db.ForeignKey("toys.id"), index=True)  # Toy offered by buyer
+    seller_toy_id = db.Column(db.Integer, db.ForeignKey("toys.id"), index=True)  # Toy offered by seller
+    buyer_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)  # User who proposed the exchange
+    idempotency_key = db.Column(db.String(100))
     
     buyer_toy = db.relationship('Toy', foreign_keys=[buyer_toy_id], backref='buyer_exchanges')
-    seller_toy = db.relationship('Toy', foreign_keys=[seller_toy_id], backref='seller_exchanges')
\ No newline at end of file
+    seller_toy = db.relationship('Toy', foreign_keys=[seller_toy_id], backref='seller_exchanges')
+    buyer = db.relationship('User', foreign_keys=[buyer_id], backref='exchanges')
+
+    __table_args__ = (db.UniqueConstraint("buyer_id", "idempotency_key", name="uq_exchanges_buyer_idempotency_key"),)
\ No newline at end of file
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+
+class HasherBusy(Exception):
+    """Raised when too many hash/verify calls are already waiting."""
+
+
+class PasswordHasher:
+    """Runs Flask-Bcrypt hashing and verification off the event loop.
+
+    bcrypt releases the GIL while it works, so a small thread pool is enough
+    to keep CPU-bound password checks from freezing every other socket.
+    Under eventlet the work goes through ``eventlet.tpool`` so only the
+    calling greenlet waits; otherwise a ``ThreadPoolExecutor`` is used. At
+    most ``PASSWORD_HASH_MAX_PENDING`` calls may be queued or running at
+    once; beyond that ``HasherBusy`` is raised so callers can shed load.
+    """
+
+    def __init__(self, app=None, bcrypt=None, async_mode=None):
+        self.pending = 0
+        self.rejected = 0
+        self._lock = Lock()
+        if app is not None:
+            self.init_app(app, bcrypt, async_mode)
+
+    def init_app(self, app, bcrypt, async_mode=None):
+        self.bcrypt = bcrypt
+        self.max_pending = app.config.get("PASSWORD_HASH_MAX_PENDING", 64)
+        workers = app.config.get("PASSWORD_HASH_WORKERS", 4)
+
+        if async_mode == "eventlet":
+            from eventlet import tpool
+            tpool.set_num_threads(workers)
+            self._execute = tpool.execute
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+            self._execute = lambda fn, *args: executor.submit(fn, *args).result()
+        app.extensions["password_hasher"] = self
+
+    def generate_password_hash(self, password):
+        return self._run(self.bcrypt.generate_password_hash, password).decode("utf-8")
+
+    def check_password_hash(self, pw_hash, password):
+        return self._run(self.bcrypt.check_password_hash, pw_hash, password)
+
+    def stats(self):
+        return {"pending": self.pending, "max_pending": self.max_pending, "rejected": self.rejected}
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HasherBusy()
+            self.pending += 1
+        try:
+            return self._execute(fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class PresenceRegistry:
+    """Who is in which chat room, per socket, held in memory.
+
+    ``rooms`` maps room -> {user_id: set of sids} so a user with several
+    tabs open stays present until the last one leaves, and ``sockets`` maps
+    sid -> {room: user_id} so a disconnect can clean up every room at once.
+    Each room also remembers the last ``remember`` users seen in it, which
+    lets the chat handler find the other party of a trade chat while they
+    are offline.
+
+    State is per process unless ``publish`` is set: every join, leave and
+    disconnect is then also handed to it, and other workers replay it with
+    ``apply()`` (see ``socket_queue.PresenceRelay``). A worker only learns
+    about joins made after it started listening, and the sockets of a
+    worker that dies without disconnecting them stay listed.
+    """
+
+    def __init__(self, remember=8):
+        self.remember = remember
+        self.rooms = {}
+        self.sockets = {}
+        self.usernames = {}
+        self.seen = {}  # room -> OrderedDict of user ids, most recent last
+        self.publish = None  # callable(update) sending our changes to the other workers
+        self._lock = Lock()
+
+    def join(self, sid, room, user_id, username):
+        self._join(sid, room, user_id, username)
+        self._share("join", sid, room, user_id, username)
+
+    def leave(self, sid, room):
+        """Remove one socket from a room; returns the user id if they are now gone from it."""
+        if room in self.sockets.get(sid, ()):
+            self._share("leave", sid, room)
+        return self._leave(sid, room)
+
+    def disconnect(self, sid):
+        """Remove a socket from every room; returns [(room, user_id)] for users now gone."""
+        if sid in self.sockets:
+            self._share("disconnect", sid)
+        return self._disconnect(sid)
+
+    def apply(self, update):
+        """Replay a join, leave or disconnect published by another worker."""
+        operation, *args = update
+        handlers = {"join": self._join, "leave": self._leave, "disconnect": self._disconnect}
+        handlers[operation](*args)
+
+    def _share(self, *update):
+        if self.publish is not None:
+            self.publish(list(update))
+
+    def _join(self, sid, room, user_id, username):
+        with self._lock:
+            self.rooms.setdefault(room, {}).setdefault(user_id, set()).add(sid)
+            self.sockets.setdefault(sid, {})[room] = user_id
+            self.usernames[user_id] = username
+            seen = self.seen.setdefault(room, OrderedDict())
+            seen[user_id] = True
+            seen.move_to_end(user_id)
+            while len(seen) > self.remember:
+                seen.popitem(last=False)
+
+    def _leave(self, sid, room):
+        with self._lock:
+            user_id = self.sockets.get(sid, {}).pop(room, None)
+            if not self.sockets.get(sid):
+                self.sockets.pop(sid, None)
+            return self._drop(room, user_id, sid)
+
+    def _disconnect(self, sid):
+        with self._lock:
+            left = []
+            for room, user_id in self.sockets.pop(sid, {}).items():
+                if self._drop(room, user_id, sid) is not None:
+                    left.append((room, user_id))
+            return left
+
+    def participants(self, room):
+        with self._lock:
+            members = self.rooms.get(room, {})
+            return [{"user_id": user_id, "username": self.usernames.get(user_id)} for user_id in members]
+
+    def user_of(self, sid):
+        """The user a socket joined its rooms as, or None before its first join."""
+        with self._lock:
+            for user_id in self.sockets.get(sid, {}).values():
+                return user_id
+            return None
+
+    def other_participant(self, room, user_id):
+        """Another user in the room: someone online if possible, else the last one seen."""
+        with self._lock:
+            for other_id in self.rooms.get(room, {}):
+                if other_id != user_id:
+                    return other_id
+            for other_id in reversed(self.seen.get(room, {})):
+                if other_id != user_id:
+                    return other_id
+            return None
+
+    def _drop(self, room, user_id, sid):
+        # Caller holds the lock
+        members = self.rooms.get(room)
+        if user_id is None or members is None or user_id not in members:
+            return None
+        members[user_id].discard(sid)
+        if members[user_id]:
+            return None
+        del members[user_id]
+        if not members:
+            del self.rooms[room]
+        return user_id
@@ -0,0 +1,190 @@
+"""Token-bucket rate limiting for Flask routes and Socket.IO events.
+
+Limits are named in ``RATE_LIMITS`` as ``"<count>/<second|minute|hour>"``:
+a bucket holds up to ``count`` tokens and refills at ``count`` per period,
+so a client can burst ``count`` calls and then keeps the average rate.
+Route buckets are keyed by client IP, or by user id for routes declared
+with ``per_user=True``, which must sit below ``@jwt_required()``. Behind a
+reverse proxy set ``TRUSTED_PROXIES`` so the IP is the client's, not the
+proxy's. Socket event buckets are keyed by the user the socket joined its
+rooms as, or by the socket id before it has joined one.
+
+Routes opt in with ``@rate_limited("name")``; over the limit they answer
+429 with ``Retry-After``. Socket handlers use
+``@rate_limited_event("name")``; a throttled event is dropped and the
+sender gets a System message with ``retry_after``. Names missing from
+``RATE_LIMITS`` are not limited.
+
+Buckets live in this process unless ``RATE_LIMIT_STORAGE_URL`` points at a
+shared store (``redis://``, needs the redis client library). Any object
+with the ``take(key, rate, capacity)`` method of ``MemoryBackend`` can be
+passed to ``RateLimiter`` instead.
+"""
+import functools
+import math
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from flask_socketio import emit
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+def parse_limit(limit):
+    """``"10/minute"`` -> ``(rate per second, capacity)``."""
+    count, _, period = limit.partition("/")
+    count = int(count)
+    if count < 1 or period not in PERIODS:
+        raise ValueError(f"Invalid rate limit {limit!r}")
+    return count / PERIODS[period], count
+
+
+class MemoryBackend:
+    """Per-process buckets, least recently used dropped beyond ``maxsize``.
+
+    A dropped bucket comes back full, which only ever errs towards letting
+    an idle client through.
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()  # key -> [tokens, last refill]
+        self._lock = Lock()
+
+    def take(self, key, rate, capacity):
+        """Spend one token; returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.maxsize:
+                    self._buckets.popitem(last=False)
+                bucket = self._buckets[key] = [capacity, now]
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate
+
+
+# Refill and spend atomically on the Redis server, using its clock so
+# every worker agrees on elapsed time
+TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """Buckets shared by every worker through one Redis hash per key."""
+
+    def __init__(self, url, prefix="ratelimit:"):
+        import redis
+
+        self.prefix = prefix
+        self._script = redis.Redis.from_url(url).register_script(TAKE_SCRIPT)
+
+    def take(self, key, rate, capacity):
+        return float(self._script(keys=[self.prefix + key], args=[rate, capacity]))
+
+
+def backend_for(url):
+    if not url:
+        return MemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE_URL {url!r}")
+
+
+class RateLimiter:
+    def __init__(self, app=None, backend=None):
+        self.backend = backend
+        self.rejected = {}
+        self._lock = Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("RATE_LIMIT_ENABLED", True)
+        self.limits = {name: parse_limit(limit) for name, limit in app.config.get("RATE_LIMITS", {}).items()}
+        if self.backend is None:
+            self.backend = backend_for(app.config.get("RATE_LIMIT_STORAGE_URL"))
+        self.rejected = {name: 0 for name in self.limits}
+        app.extensions["rate_limiter"] = self
+
+    def check(self, name, key):
+        """Seconds the caller must wait before ``name`` is allowed again; 0 if allowed now."""
+        limit = self.limits.get(name)
+        if limit is None or not self.enabled:
+            return 0
+        retry_after = self.backend.take(f"{name}:{key}", *limit)
+        if retry_after:
+            with self._lock:
+                self.rejected[name] += 1
+        return retry_after
+
+    def stats(self):
+        return {f"rejected_{name}": count for name, count in self.rejected.items()}
+
+
+def rate_limited(name, per_user=False):
+    """Decorator answering 429 with Retry-After once a route's bucket is empty."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            limiter = current_app.extensions.get("rate_limiter")
+            if limiter is not None:
+                key = f"user:{get_jwt_identity()}" if per_user else f"ip:{request.remote_addr}"
+                retry_after = limiter.check(name, key)
+                if retry_after:
+                    return (
+                        jsonify({"error": "Too many requests, please slow down"}),
+                        429,
+                        {"Retry-After": str(math.ceil(retry_after))},
+                    )
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _event_key():
+    presence = current_app.extensions.get("presence")
+    user_id = presence.user_of(request.sid) if presence is not None else None
+    return f"user:{user_id}" if user_id is not None else f"sid:{request.sid}"
+
+
+def rate_limited_event(name):
+    """Decorator dropping a Socket.IO event once the sender's bucket is empty."""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            limiter = current_app.extensions.get("rate_limiter")
+            if limiter is not None:
+                retry_after = limiter.check(name, _event_key())
+                if retry_after:
+                    emit("message", {
+                        "user": "System",
+                        "text": "You're sending messages too fast. Please wait a moment.",
+                        "retry_after": math.ceil(retry_after),
+                    })
+                    return None
+            return handler(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,124 @@
+import sqlalchemy as sa
+from sqlalchemy import event
+
+from models import db, Toy
+
+# External-content FTS5 table over toys.name/description, kept in sync by
+# triggers so every write path (ORM, bulk insert, raw SQL) updates it.
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS toys_fts USING fts5(
+        name, description, content='toys', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS toys_fts_insert AFTER INSERT ON toys BEGIN
+        INSERT INTO toys_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS toys_fts_delete AFTER DELETE ON toys BEGIN
+        INSERT INTO toys_fts(toys_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS toys_fts_update AFTER UPDATE OF name, description ON toys BEGIN
+        INSERT INTO toys_fts(toys_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO toys_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+toys_fts = sa.table("toys_fts", sa.column("rowid"), sa.column("rank"), sa.column("toys_fts"))
+
+FACETS = {"age_group": Toy.age_group, "condition": Toy.condition}
+
+
+def uses_fts():
+    return db.engine.dialect.name == "sqlite"
+
+
+def _create_fts(connection):
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='toys_fts'"
+    ).first()
+    for statement in FTS_DDL:
+        connection.exec_driver_sql(statement)
+    if not exists:
+        connection.exec_driver_sql("INSERT INTO toys_fts(toys_fts) VALUES ('rebuild')")
+
+
+def create_search_index():
+    """Create the FTS table and triggers if missing and index existing toys."""
+    if not uses_fts():
+        return
+    with db.engine.begin() as connection:
+        _create_fts(connection)
+
+
+@event.listens_for(Toy.__table__, "after_create")
+def _on_toys_created(table, connection, **kw):
+    # db.create_all() builds the index alongside toys, so /toys/search works
+    # on any fresh database; older ones still need create_search_index()
+    if connection.dialect.name == "sqlite":
+        _create_fts(connection)
+
+
+def match_expression(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    terms = ['"%s"*' % word.replace('"', '""') for word in text.split()]
+    return " ".join(terms)
+
+
+def search_toys(text=None, filters=None, min_price=None, max_price=None, after=None, limit=20):
+    """Return (rows, next_cursor, facet_counts) for one page of search results.
+
+    With ``text`` results are ranked by bm25 and ``after`` is the
+    ``"<rank>,<id>"`` cursor of the last row seen; without it they are
+    ordered by id and ``after`` is a toy id.
+    """
+    filters = filters or {}
+    columns = [Toy.id, Toy.name, Toy.price, Toy.image_filename, Toy.age_group, Toy.condition]
+
+    def base(*extra_columns, skip_facet=None):
+        query = db.session.query(*extra_columns).filter(Toy.status == "Available")
+        if text:
+            if uses_fts():
+                query = query.join(toys_fts, toys_fts.c.rowid == Toy.id).filter(
+                    toys_fts.c.toys_fts.op("MATCH")(match_expression(text))
+                )
+            else:
+                pattern = f"%{text}%"
+                query = query.filter(db.or_(Toy.name.ilike(pattern), Toy.description.ilike(pattern)))
+        for name, value in filters.items():
+            if name != skip_facet:
+                query = query.filter(FACETS[name] == value)
+        if min_price is not None:
+            query = query.filter(Toy.price >= min_price)
+        if max_price is not None:
+            query = query.filter(Toy.price <= max_price)
+        return query
+
+    ranked = bool(text) and uses_fts()
+    if ranked:
+        query = base(*columns, toys_fts.c.rank)
+        if after:
+            after_rank, after_id = after.split(",")
+            after_rank, after_id = float(after_rank), int(after_id)
+            query = query.filter(db.or_(
+                toys_fts.c.rank > after_rank,
+                db.and_(toys_fts.c.rank == after_rank, Toy.id > after_id),
+            ))
+        query = query.order_by(toys_fts.c.rank, Toy.id)
+    else:
+        query = base(*columns)
+        if after:
+            query = query.filter(Toy.id > int(after))
+        query = query.order_by(Toy.id)
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = f"{last.rank!r},{last.id}" if ranked else str(last.id)
+
+    # Each facet is counted with every filter applied except its own
+    facet_counts = {}
+    for name, column in FACETS.items():
+        counts = base(column, db.func.count(), skip_facet=name).group_by(column).all()
+        facet_counts[name] = {value: count for value, count in counts}
+
+    return rows, next_cursor, facet_counts
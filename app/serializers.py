@@ -0,0 +1,161 @@
+"""How the API turns rows into JSON.
+
+One function per model shape builds the dict for a row, which may be an ORM
+object or a ``with_entities`` tuple, so every endpoint shows a toy, message
+or user the same way. ``dumps`` uses orjson when it is installed and the
+standard library otherwise; ``FastJSONProvider`` does the same for
+``jsonify``. Timestamps go out as ``YYYY-MM-DD HH:MM:SS``; for message
+history ``timestamp_text`` has the database format the whole page instead
+of parsing each value into a ``datetime`` and formatting it back.
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import func
+
+from image_store import ImageStore
+from models import db
+
+try:
+    import orjson
+    # Dates still go through Flask's default hook, as they did before orjson
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dumps(obj):
+    """Compact JSON as bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, separators=(",", ":"), default=DefaultJSONProvider.default).encode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """``jsonify`` through ``dumps``: compact, keys in the order serializers build them."""
+
+    sort_keys = False
+    compact = True
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        return self._app.response_class(dumps(self._prepare_response_obj(args, kwargs)), mimetype=self.mimetype)
+
+
+# ============================
+# TIMESTAMPS
+# ============================
+def format_timestamp(value):
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat(" ", "seconds")
+
+
+def timestamp_text(column):
+    """``column`` as ``format_timestamp`` text, computed by the database where it can."""
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        # Already stored as ISO text: drop the fraction
+        return func.substr(column, 1, 19)
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM-DD HH24:MI:SS")
+    return column
+
+
+# ============================
+# TOYS
+# ============================
+def thumbnail_url(image_filename):
+    # Older toys store whatever string the client sent; only uploads have thumbnails
+    if not ImageStore.is_stored_name(image_filename):
+        return None
+    return f"/images/{ImageStore.thumbnail_name(image_filename)}"
+
+
+def toy_summary(row):
+    """A toy in the /home feed."""
+    return {
+        "id": row.id,
+        "name": row.name,
+        "price": row.price,
+        "image": row.image_filename,
+        "thumbnail": thumbnail_url(row.image_filename),
+    }
+
+
+def toy_listing(row):
+    """A toy in search results and recommendations."""
+    return {
+        "id": row.id,
+        "name": row.name,
+        "price": row.price,
+        "image": row.image_filename,
+        "thumbnail": thumbnail_url(row.image_filename),
+        "age_group": row.age_group,
+        "condition": row.condition,
+    }
+
+
+def toy_detail(toy):
+    """Every field of a toy, as its owner sees it."""
+    return {
+        "id": toy.id,
+        "name": toy.name,
+        "age_group": toy.age_group,
+        "description": toy.description,
+        "condition": toy.condition,
+        "price": toy.price,
+        "image_filename": toy.image_filename,
+        "thumbnail": thumbnail_url(toy.image_filename),
+    }
+
+
+# ============================
+# USERS & MESSAGES
+# ============================
+def user_profile(user):
+    return {
+        "username": user.username,
+        "email": user.email,
+        "phone_number": user.phone_number,
+        "toys": [toy_detail(toy) for toy in user.toys],
+    }
+
+
+def message(row, usernames):
+    """A chat message; ``usernames`` maps sender ids to names."""
+    return {
+        "id": row.id,
+        "message": row.message_text,
+        "timestamp": format_timestamp(row.timestamp),
+        "sender": usernames.get(row.sender_id),
+    }
+
+
+# ============================
+# PAYMENTS & EXCHANGES
+# ============================
+def payment(row):
+    return {
+        "id": row.id,
+        "amount": row.amount,
+        "status": row.status,
+        "buyer_id": row.buyer_id,
+        "toy_id": row.toy_id,
+        "timestamp": format_timestamp(row.timestamp),
+    }
+
+
+def exchange(row):
+    return {
+        "id": row.id,
+        "status": row.status,
+        "buyer_id": row.buyer_id,
+        "buyer_toy_id": row.buyer_toy_id,
+        "seller_toy_id": row.seller_toy_id,
+        "timestamp": format_timestamp(row.timestamp),
+    }
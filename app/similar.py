@@ -0,0 +1,250 @@
+"""Precomputed "similar toys" for trade discovery.
+
+Each toy becomes a sparse TF-IDF vector over the words of its name (counted
+twice) and description. Two toys score ``TEXT_WEIGHT`` times the cosine of
+their vectors, plus fixed bonuses for the same age group, the same
+condition and a close price band (bands double in width: 0-1, 1-3, 3-7,
+...). Every toy keeps its best ``neighbours`` matches, so a lookup is a
+dict read.
+
+A new toy is scored against candidates from the inverted index, rarest
+words first, capped at ``max_candidates``, and is offered to each of their
+lists too, so adding a toy never needs a rebuild. Older toys keep the IDF
+weights they were given until the next full rebuild.
+
+The index is per process. The first lookup starts loading it on a
+background thread and callers get nothing until it is ready: from the
+snapshot written by ``flask rebuild-similar-toys`` when there is one (then
+topped up with toys created since), otherwise straight from the database,
+which takes seconds per thousand toys. Run the command on deploy.
+"""
+import heapq
+import logging
+import math
+import os
+import pickle
+import re
+import threading
+from collections import Counter, defaultdict
+
+import click
+
+from models import Toy
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("a an and are for from in is it of on or the this to very with".split())
+TEXT_WEIGHT = 0.6
+AGE_WEIGHT = 0.2
+CONDITION_WEIGHT = 0.1
+PRICE_WEIGHT = 0.1
+PRICE_BONUS = {0: PRICE_WEIGHT, 1: PRICE_WEIGHT / 2}  # by distance between price bands
+SNAPSHOT_VERSION = 1
+TOY_COLUMNS = (Toy.id, Toy.name, Toy.description, Toy.age_group, Toy.condition, Toy.price)
+
+
+def term_counts(name, description):
+    text = f"{name} {name} {description}".lower()
+    return Counter(word for word in TOKEN.findall(text) if len(word) > 1 and word not in STOPWORDS)
+
+
+def price_band(price):
+    return int(math.log2(max(price or 0, 0) + 1))
+
+
+class SimilarToys:
+    def __init__(self, app=None, neighbours=20, max_candidates=200, async_mode=None):
+        self.neighbours_kept = neighbours
+        self.max_candidates = max_candidates
+        self.loaded = False
+        self.loading = False
+        self._lock = threading.RLock()
+        self._loading_lock = threading.Lock()
+        self._reset()
+        if app is not None:
+            self.init_app(app, async_mode)
+
+    def init_app(self, app, async_mode=None):
+        self.app = app
+        self.snapshot_path = app.config.get("SIMILAR_TOYS_SNAPSHOT") or os.path.join(
+            app.instance_path, "similar_toys.pickle")
+        if async_mode == "eventlet":
+            # A green thread would hold the hub for the whole build
+            import eventlet
+            from eventlet import tpool
+            self._start = lambda fn: eventlet.spawn(tpool.execute, fn)
+        else:
+            self._start = lambda fn: threading.Thread(target=fn, name="similar-toys", daemon=True).start()
+        app.cli.command("rebuild-similar-toys")(self._rebuild_command)
+        app.extensions["similar_toys"] = self
+
+    def similar_to(self, toy_id):
+        """``[(score, toy_id)]`` best first, or None if the toy isn't indexed."""
+        neighbours = self.neighbours.get(toy_id)
+        return None if neighbours is None else list(neighbours)
+
+    def add(self, row):
+        """Index one toy (any object with the ``TOY_COLUMNS`` attributes)."""
+        if not self.loaded:
+            return  # picked up when the index loads
+        with self._lock:
+            if row.id in self.docs:
+                return
+            counts = term_counts(row.name, row.description)
+            self.n_docs += 1
+            self.df.update(counts.keys())
+            self._store(row, counts)
+            self._link(row.id)
+
+    def catch_up(self):
+        """Index toys created since the index was built, e.g. by /toys/bulk."""
+        if not self.loaded:
+            return
+        rows = Toy.query.with_entities(*TOY_COLUMNS).filter(Toy.id > self.max_id).order_by(Toy.id).all()
+        for row in rows:
+            self.add(row)
+
+    def ensure_loaded(self):
+        """True once the index is ready; otherwise starts loading it in the background."""
+        if self.loaded:
+            return True
+        with self._loading_lock:
+            if not self.loaded and not self.loading:
+                self.loading = True
+                self._start(self._load_in_background)
+        return False
+
+    def rebuild(self):
+        """Rebuild every vector and neighbour list from the database."""
+        rows = Toy.query.with_entities(*TOY_COLUMNS).order_by(Toy.id).all()
+        with self._lock:
+            self._reset()
+            counts = [term_counts(row.name, row.description) for row in rows]
+            self.n_docs = len(rows)
+            for toy_counts in counts:
+                self.df.update(toy_counts.keys())
+            for row, toy_counts in zip(rows, counts):
+                self._store(row, toy_counts)
+            for row in rows:
+                self._link(row.id)
+            self.loaded = True
+
+    def save(self, path):
+        state = {
+            "version": SNAPSHOT_VERSION,
+            "n_docs": self.n_docs,
+            "df": self.df,
+            "docs": self.docs,
+            "neighbours": self.neighbours,
+            "max_id": self.max_id,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as snapshot:
+            pickle.dump(state, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Replace the index with a snapshot; False if there is no usable one."""
+        try:
+            with open(path, "rb") as snapshot:
+                state = pickle.load(snapshot)
+        except FileNotFoundError:
+            return False
+        if state.get("version") != SNAPSHOT_VERSION:
+            return False
+        with self._lock:
+            self._reset()
+            self.n_docs = state["n_docs"]
+            self.df = state["df"]
+            self.docs = state["docs"]
+            self.neighbours = state["neighbours"]
+            self.max_id = state["max_id"]
+            for toy_id, (vector, *_) in self.docs.items():
+                for term, weight in vector.items():
+                    self.postings[term][toy_id] = weight
+        return True
+
+    def stats(self):
+        return {"toys": len(self.docs), "terms": len(self.postings), "loaded": int(self.loaded), "loading": int(self.loading)}
+
+    def _load_in_background(self):
+        try:
+            with self.app.app_context():
+                if self.load(self.snapshot_path):
+                    self.loaded = True
+                else:
+                    logger.warning("No similar-toys snapshot at %s, building from the database", self.snapshot_path)
+                    self.rebuild()
+                self.catch_up()  # toys created while it loaded
+        except Exception:
+            logger.exception("Loading the similar-toys index failed")
+        finally:
+            self.loading = False
+
+    def _rebuild_command(self):
+        """Rebuild the similar-toys index and save its snapshot."""
+        self.rebuild()
+        self.save(self.snapshot_path)
+        click.echo(f"Indexed {len(self.docs)} toys into {self.snapshot_path}")
+
+    def _reset(self):
+        self.n_docs = 0
+        self.df = Counter()
+        self.docs = {}  # toy id -> (vector, age_group, condition, price band)
+        self.postings = defaultdict(dict)  # term -> {toy id: weight}
+        self.neighbours = {}  # toy id -> [(score, toy id)], best first
+        self.max_id = 0
+
+    def _store(self, row, counts):
+        # Caller holds the lock
+        vector = {}
+        for term, count in counts.items():
+            idf = math.log((1 + self.n_docs) / (1 + self.df[term])) + 1
+            vector[term] = (1 + math.log(count)) * idf
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vector = {term: weight / norm for term, weight in vector.items()}
+        self.docs[row.id] = (vector, row.age_group, row.condition, price_band(row.price))
+        for term, weight in vector.items():
+            self.postings[term][row.id] = weight
+        self.max_id = max(self.max_id, row.id)
+
+    def _link(self, toy_id):
+        # Caller holds the lock
+        doc = self.docs[toy_id]
+        candidates = set()
+        for term in sorted(doc[0], key=lambda term: len(self.postings[term])):
+            for other_id in self.postings[term]:
+                if other_id != toy_id:
+                    candidates.add(other_id)
+                    if len(candidates) >= self.max_candidates:
+                        break
+            if len(candidates) >= self.max_candidates:
+                break
+
+        # Scored inline: this loop is most of a rebuild
+        vector, age_group, condition, band = doc
+        terms = vector.keys()
+        neighbours = self.neighbours
+        kept = self.neighbours_kept
+        scores = {other_id: score for score, other_id in neighbours.get(toy_id, ())}
+        for other_id in candidates:
+            other_vector, other_age_group, other_condition, other_band = self.docs[other_id]
+            score = TEXT_WEIGHT * sum([vector[term] * other_vector[term] for term in terms & other_vector.keys()])
+            score += PRICE_BONUS.get(abs(band - other_band), 0.0)
+            if age_group == other_age_group:
+                score += AGE_WEIGHT
+            if condition == other_condition:
+                score += CONDITION_WEIGHT
+            scores[other_id] = score
+            other_neighbours = neighbours.get(other_id)
+            if other_neighbours is None or len(other_neighbours) < kept or score > other_neighbours[-1][0]:
+                self._offer(other_id, toy_id, score)
+        neighbours[toy_id] = heapq.nlargest(kept, ((score, other_id) for other_id, score in scores.items()))
+
+    def _offer(self, toy_id, other_id, score):
+        neighbours = [entry for entry in self.neighbours.get(toy_id, ()) if entry[1] != other_id]
+        neighbours.append((score, other_id))
+        neighbours.sort(reverse=True)
+        self.neighbours[toy_id] = neighbours[:self.neighbours_kept]
@@ -0,0 +1,238 @@
+"""Message queue wiring for running Socket.IO across several workers.
+
+``SOCKETIO_MESSAGE_QUEUE`` picks the backend shared by every worker:
+
+* ``redis://``, ``rediss://``, ``kafka://``, ``zmq+tcp://``, ``amqp://`` ... are
+  handed to Flask-SocketIO's own managers (needs the matching client library).
+* ``local://host:port`` uses ``LocalQueueManager`` with the small TCP broker in
+  this module, a dependency-free stand-in for development and load tests::
+
+      python socket_queue.py --host 127.0.0.1 --port 5055
+
+  Frames are pickled and the broker has no authentication, so anyone who
+  could connect to it could run code in every worker: ``LocalBroker``
+  refuses to listen on anything but a loopback address. Workers on several
+  hosts need one of the real queues above.
+
+* unset keeps the default single-process manager.
+
+Every queued manager is also a ``PresenceRelay``, so chat presence is shared
+by all the workers on the queue.
+"""
+import argparse
+import ipaddress
+import pickle
+import socket
+import socketserver
+import struct
+import threading
+
+import socketio
+
+FRAME_HEADER = struct.Struct("!I")
+PUBLISHER = b"P"
+SUBSCRIBER = b"S"
+
+
+PRESENCE_NAMESPACE = "/_presence"
+
+
+def queue_options(url):
+    """Keyword arguments for ``SocketIO()`` selecting the queue at ``url``."""
+    if not url:
+        # Explicitly, or SocketIO keeps the manager of an app built earlier in this process
+        return {"client_manager": None}
+    if url.startswith("local://"):
+        return {"client_manager": LocalQueueManager(url)}
+    # The same managers Flask-SocketIO would pick for message_queue=url
+    if url.startswith(("redis://", "rediss://")):
+        base = socketio.RedisManager
+    elif url.startswith("kafka://"):
+        base = socketio.KafkaManager
+    elif url.startswith("zmq"):
+        base = socketio.ZmqManager
+    else:
+        base = socketio.KombuManager
+    manager_class = type(base.__name__, (PresenceRelay, base), {})
+    return {"client_manager": manager_class(url, channel="flask-socketio")}
+
+
+class PresenceRelay:
+    """Client manager mixin that mirrors a ``PresenceRegistry`` across workers.
+
+    Registry updates travel as emits to a namespace no client connects to,
+    so the usual channel carries them and ``PubSubManager`` already skips
+    the ones this worker published.
+    """
+
+    presence = None
+
+    def share_presence(self, registry):
+        self.presence = registry
+        registry.publish = self._publish_presence
+        if not self.server.manager_initialized:
+            # Listen from startup rather than from this worker's first socket,
+            # so /rooms/<room>/participants sees the other workers' joins
+            self.server.manager_initialized = True
+            self.initialize()
+
+    def _publish_presence(self, update):
+        self._publish({
+            "method": "emit", "event": "presence", "data": update, "namespace": PRESENCE_NAMESPACE,
+            "room": None, "skip_sid": None, "callback": None, "host_id": self.host_id,
+        })
+
+    def _handle_emit(self, message):
+        if message.get("namespace") != PRESENCE_NAMESPACE:
+            return super()._handle_emit(message)
+        if self.presence is not None:
+            self.presence.apply(message["data"])
+
+
+def _recv_exact(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("queue connection closed")
+        data += chunk
+    return data
+
+
+def _recv_frame(sock):
+    (size,) = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))
+    return _recv_exact(sock, size)
+
+
+def _frame(payload):
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class LocalQueueManager(PresenceRelay, socketio.PubSubManager):
+    """Socket.IO client manager that relays through the local TCP broker.
+
+    Publishing and listening use separate connections; the broker copies
+    every published frame to all subscribers, and ``PubSubManager`` drops
+    the ones this host sent itself.
+    """
+
+    name = "local"
+
+    def __init__(self, url="local://127.0.0.1:5055", channel="flask-socketio", write_only=False, logger=None):
+        host, port = url[len("local://"):].rsplit(":", 1)
+        self.address = (host, int(port))
+        self._socket_module = socket
+        self._publish_lock = threading.Lock()
+        self._publisher = None
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+
+    def initialize(self):
+        if self.server.async_mode == "eventlet":
+            # Plain sockets and locks would block the whole hub
+            from eventlet.green import socket as green_socket
+            from eventlet.semaphore import Semaphore
+            self._socket_module = green_socket
+            self._publish_lock = Semaphore()
+        super().initialize()
+
+    def _connect(self, role):
+        sock = self._socket_module.create_connection(self.address)
+        sock.sendall(role)
+        return sock
+
+    def _publish(self, data):
+        payload = _frame(pickle.dumps({"channel": self.channel, "data": data}))
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publisher is None:
+                        self._publisher = self._connect(PUBLISHER)
+                    self._publisher.sendall(payload)
+                    return
+                except OSError:
+                    self._publisher = None
+                    if attempt:
+                        raise
+
+    def _listen(self):
+        retry_sleep = 1
+        while True:
+            try:
+                subscriber = self._connect(SUBSCRIBER)
+            except OSError:
+                self._get_logger().error("Cannot reach the queue broker... retrying in %s secs", retry_sleep)
+                self.server.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 60)
+                continue
+            retry_sleep = 1
+            try:
+                while True:
+                    message = pickle.loads(_recv_frame(subscriber))
+                    if message.get("channel") == self.channel:
+                        yield message["data"]
+            except OSError:
+                self._get_logger().error("Lost the queue broker... reconnecting")
+            finally:
+                subscriber.close()
+
+
+class _BrokerHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        role = _recv_exact(self.request, 1)
+        if role == SUBSCRIBER:
+            self.server.add_subscriber(self.request)
+            try:
+                # Subscribers never send; block until they hang up
+                while self.request.recv(1024):
+                    pass
+            except OSError:
+                pass  # reset by a worker that exited, or closed after a failed broadcast
+            finally:
+                self.server.remove_subscriber(self.request)
+        elif role == PUBLISHER:
+            try:
+                while True:
+                    self.server.broadcast(_frame(_recv_frame(self.request)))
+            except ConnectionError:
+                pass
+
+
+class LocalBroker(socketserver.ThreadingTCPServer):
+    """Fan-out broker for ``LocalQueueManager``: every frame goes to every subscriber."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=5055):
+        if not ipaddress.ip_address(socket.gethostbyname(host)).is_loopback:
+            raise ValueError(f"LocalBroker only listens on loopback addresses, not {host!r}")
+        super().__init__((host, port), _BrokerHandler)
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def add_subscriber(self, sock):
+        with self._lock:
+            self._subscribers.append(sock)
+
+    def remove_subscriber(self, sock):
+        with self._lock:
+            if sock in self._subscribers:
+                self._subscribers.remove(sock)
+
+    def broadcast(self, frame):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sock in subscribers:
+            try:
+                sock.sendall(frame)
+            except OSError:
+                self.remove_subscriber(sock)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the local Socket.IO message broker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+    with LocalBroker(args.host, args.port) as broker:
+        broker.serve_forever()
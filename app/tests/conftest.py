@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules import each other as top-level modules, as under `flask run`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import User, db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user and return ``(id, Authorization headers)``."""
+    def make_user(username):
+        with app.app_context():
+            user = User(username=username, email=f"{username}@example.com", phone_number="0", password="x")
+            db.session.add(user)
+            db.session.commit()
+            return user.id, {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+    return make_user
@@ -0,0 +1,30 @@
+from models import User
+
+
+def signup(client, username, email):
+    return client.post("/signup", json={
+        "username": username, "email": email, "phone_number": "0", "password": "secret",
+    })
+
+
+def test_signup_rejects_duplicates(client):
+    assert signup(client, "alice", "alice@example.com").status_code == 201
+    assert signup(client, "alice2", "alice@example.com").json == {"error": "Email already exists"}
+    assert signup(client, "alice", "other@example.com").json == {"error": "Username already exists"}
+
+
+def test_signup_race_past_the_cache_check_is_a_400(app, client, monkeypatch):
+    assert signup(client, "alice", "alice@example.com").status_code == 201
+    # As if the other signup committed between our checks and our insert
+    cache = app.extensions["user_cache"]
+    monkeypatch.setattr(cache, "get_by_email", lambda email: None)
+    monkeypatch.setattr(cache, "get_by_username", lambda username: None)
+
+    response = signup(client, "alice2", "alice@example.com")
+    assert response.status_code == 400
+    assert response.json == {"error": "Email already exists"}
+    response = signup(client, "alice", "other@example.com")
+    assert response.status_code == 400
+    assert response.json == {"error": "Username already exists"}
+    with app.app_context():
+        assert User.query.count() == 1
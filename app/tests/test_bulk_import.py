@@ -0,0 +1,62 @@
+import io
+import json
+
+from models import Toy, db
+
+KITE = {"name": "kite", "age_group": "6-8", "description": "a red kite", "condition": "new",
+        "price": 5, "image_filename": "kite.png"}
+CSV_HEADER = "name,age_group,description,condition,price,image_filename\n"
+
+
+def toy_names(app):
+    with app.app_context():
+        return [toy.name for toy in db.session.query(Toy).order_by(Toy.id)]
+
+
+def test_json_array_all_created(app, client, make_user):
+    _, headers = make_user("alice")
+    response = client.post("/toys/bulk", json=[KITE, {**KITE, "name": "ball"}], headers=headers)
+    assert response.status_code == 201
+    assert response.json == {"created": 2, "errors": []}
+    assert toy_names(app) == ["kite", "ball"]
+
+
+def test_json_body_must_be_an_array(client, make_user):
+    _, headers = make_user("alice")
+    assert client.post("/toys/bulk", json=KITE, headers=headers).status_code == 400
+
+
+def test_ndjson_reports_rejected_rows_by_index(app, client, make_user):
+    _, headers = make_user("alice")
+    lines = [json.dumps(KITE), "not json", json.dumps({**KITE, "price": "free"}),
+             json.dumps({**KITE, "name": "", "description": ""}), json.dumps({**KITE, "name": "ball"})]
+    response = client.post("/toys/bulk", data="\n".join(lines), content_type="application/x-ndjson",
+                           headers=headers)
+    assert response.status_code == 207
+    assert response.json == {"created": 2, "errors": [
+        {"row": 1, "error": "Expected a toy object"},
+        {"row": 2, "error": "Invalid price"},
+        {"row": 3, "error": "Missing or invalid fields: name, description"},
+    ]}
+    assert toy_names(app) == ["kite", "ball"]
+
+
+def test_csv_body_and_file_upload(app, client, make_user):
+    _, headers = make_user("alice")
+    body = CSV_HEADER + "kite,6-8,a red kite,new,5,kite.png\n"
+    response = client.post("/toys/bulk", data=body, content_type="text/csv", headers=headers)
+    assert response.status_code == 201
+
+    upload = {"file": (io.BytesIO((CSV_HEADER + "ball,3-5,a ball,used,2.5,ball.png\n").encode()), "toys.csv")}
+    response = client.post("/toys/bulk", data=upload, content_type="multipart/form-data", headers=headers)
+    assert response.json == {"created": 1, "errors": []}
+    assert toy_names(app) == ["kite", "ball"]
+
+
+def test_nothing_created_is_a_422(app, client, make_user):
+    _, headers = make_user("alice")
+    body = CSV_HEADER + "kite,6-8,a red kite,new,cheap,kite.png\n,6-8,no name,new,5,x.png\n"
+    response = client.post("/toys/bulk", data=body, content_type="text/csv", headers=headers)
+    assert response.status_code == 422
+    assert [error["row"] for error in response.json["errors"]] == [0, 1]
+    assert toy_names(app) == []
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from app import create_app
+from blueprints.chat import find_receiver
+from extensions import socketio
+from models import User, db
+from socket_queue import LocalBroker
+
+
+def texts(socket_client):
+    # A single emitted dict comes back as args itself
+    return [event["args"]["text"] for event in socket_client.get_received() if event["name"] == "message"]
+
+
+def test_message_without_receiver_is_refused(app, client, make_user):
+    make_user("alice")
+    make_user("bob")
+    alice = socketio.test_client(app)
+    alice.emit("join", {"user": "alice", "room": "trade-1"})
+    alice.get_received()
+
+    alice.emit("message", {"user": "alice", "message": "anyone there?", "room": "trade-1"})
+    received = texts(alice)
+    assert "anyone there?" not in received
+    assert any("Nobody else" in text for text in received)
+
+    bob = socketio.test_client(app)
+    bob.emit("join", {"user": "bob", "room": "trade-1"})
+    alice.emit("message", {"user": "alice", "message": "hi bob", "room": "trade-1"})
+    assert "hi bob" in texts(bob)
+
+    writer = app.extensions["message_writer"]
+    writer.flush()
+    assert writer.failed_rows == 0
+    assert [message["message"] for message in client.get("/messages/trade-1").json["messages"]] == ["hi bob"]
+
+
+def test_presence_is_shared_through_the_queue(tmp_path):
+    broker = LocalBroker("127.0.0.1", 0)
+    threading.Thread(target=broker.serve_forever, daemon=True).start()
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'chat.db'}",
+        "SOCKETIO_ASYNC_MODE": "threading",
+        "SOCKETIO_MESSAGE_QUEUE": "local://127.0.0.1:%d" % broker.server_address[1],
+    }
+    try:
+        worker_a = create_app(config)
+        worker_b = create_app(config)
+        with worker_b.app_context():
+            db.create_all()
+            alice, bob = (User(username=name, email=f"{name}@example.com", phone_number="0", password="x")
+                          for name in ("alice", "bob"))
+            db.session.add_all([alice, bob])
+            db.session.commit()
+            alice_id, bob_id = alice.id, bob.id
+
+        def participants():
+            return worker_b.test_client().get("/rooms/trade-1/participants").json["participants"]
+
+        def wait_for(condition):
+            deadline = time.monotonic() + 5
+            while not condition() and time.monotonic() < deadline:
+                time.sleep(0.02)
+            return condition()
+
+        assert wait_for(lambda: len(broker._subscribers) == 2)  # both workers are listening
+
+        # Alice's socket lives on worker A, Bob's on worker B
+        worker_a.extensions["presence"].join("sid-alice", "trade-1", alice_id, "alice")
+        assert wait_for(lambda: participants() == [{"user_id": alice_id, "username": "alice"}])
+
+        # Worker B can route Bob's first message to Alice
+        worker_b.extensions["presence"].join("sid-bob", "trade-1", bob_id, "bob")
+        with worker_b.app_context():
+            assert find_receiver("trade-1", bob_id) == alice_id
+        assert wait_for(lambda: len(worker_a.extensions["presence"].participants("trade-1")) == 2)
+
+        worker_a.extensions["presence"].disconnect("sid-alice")
+        assert wait_for(lambda: [user["username"] for user in participants()] == ["bob"])
+    finally:
+        broker.shutdown()
+        broker.server_close()
@@ -0,0 +1,24 @@
+from cache import ResponseCache
+from models import Toy, db
+
+
+def test_home_cursor_is_readable_cross_origin(app, client, make_user):
+    user_id, _ = make_user("seller")
+    with app.app_context():
+        db.session.add_all([
+            Toy(name=f"toy {index}", age_group="3-5", description="a toy", condition="used",
+                price=1, image_filename="toy.png", user_id=user_id)
+            for index in range(3)
+        ])
+        db.session.commit()
+
+    response = client.get("/home?limit=2", headers={"Origin": "https://frontend.example.com"})
+    assert response.headers["X-Next-Cursor"] == "2"
+    exposed = {name.strip().lower() for name in response.headers["Access-Control-Expose-Headers"].split(",")}
+    assert {"x-next-cursor", "etag"} <= exposed
+
+
+def test_response_cache_entries_expire():
+    cache = ResponseCache(ttl=-1)
+    cache.set("page", b"[]")
+    assert cache.get("page") is None
@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+
+from flask_jwt_extended import create_access_token
+
+from jwt_cache import MemoryBlocklist, VerifiedTokenCache
+
+
+def test_logout_revokes_a_cached_token(app, client, make_user):
+    _, headers = make_user("alice")
+    assert client.get("/exchanges", headers=headers).status_code == 200
+    assert client.post("/logout", headers=headers).status_code == 200
+
+    assert client.get("/exchanges", headers=headers).status_code == 401
+    assert app.extensions["token_cache"].hits >= 1
+
+
+def test_cached_token_expires_with_the_token(app, client, make_user):
+    user_id, _ = make_user("alice")
+    with app.app_context():
+        token = create_access_token(identity=str(user_id), expires_delta=timedelta(seconds=1))
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/exchanges", headers=headers).status_code == 200
+
+    time.sleep(1.1)
+    assert client.get("/exchanges", headers=headers).status_code == 401
+
+
+def test_token_cache_keeps_entries_no_longer_than_exp():
+    cache = VerifiedTokenCache(ttl=300)
+    cache.set(b"live", {"exp": time.time() + 60})
+    cache.set(b"expired", {"exp": time.time() - 1})
+    assert cache.get(b"live") is not None
+    assert cache.get(b"expired") is None
+
+
+def test_blocklist_purges_expired_before_evicting():
+    blocklist = MemoryBlocklist(maxsize=2)
+    now = time.time()
+    blocklist.add("expired", now - 1)
+    blocklist.add("late", now + 200)
+    blocklist.add("soon", now + 10)
+    assert blocklist.evictions == 0
+    assert "late" in blocklist and "soon" in blocklist
+
+    # Full of live revocations: the one closest to expiring goes
+    blocklist.add("later", now + 300)
+    assert blocklist.evictions == 1
+    assert "soon" not in blocklist
+    assert "late" in blocklist and "later" in blocklist
@@ -0,0 +1,67 @@
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from extensions import socketio
+from models import User, db
+
+
+def limited_app(**overrides):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "SOCKETIO_ASYNC_MODE": "threading",
+        "SOCKETIO_MESSAGE_QUEUE": None,
+        "RATE_LIMIT_ENABLED": True,
+        **overrides,
+    })
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def test_login_limit_is_per_forwarded_client():
+    app = limited_app(RATE_LIMITS={"login": "2/minute"}, TRUSTED_PROXIES=1)
+    client = app.test_client()
+
+    def login(ip):
+        return client.post("/login", json={}, headers={"X-Forwarded-For": ip}).status_code
+
+    assert [login("203.0.113.1") for _ in range(3)][-1] == 429
+    assert login("203.0.113.2") != 429
+
+
+def test_message_limit_is_per_sender():
+    app = limited_app(RATE_LIMITS={"message": "1/minute"})
+    with app.app_context():
+        db.session.add_all([
+            User(username=name, email=f"{name}@example.com", phone_number="0", password="x")
+            for name in ("alice", "bob")
+        ])
+        db.session.commit()
+    alice = socketio.test_client(app)
+    bob = socketio.test_client(app)
+    alice.emit("join", {"user": "alice", "room": "trade-1"})
+    bob.emit("join", {"user": "bob", "room": "trade-1"})
+
+    alice.emit("message", {"user": "alice", "message": "one", "room": "trade-1"})
+    alice.emit("message", {"user": "alice", "message": "two", "room": "trade-1"})
+    bob.emit("message", {"user": "bob", "message": "three", "room": "trade-1"})
+
+    texts = [event["args"]["text"] for event in bob.get_received() if event["name"] == "message"]
+    assert "one" in texts and "three" in texts and "two" not in texts
+
+
+def test_bulk_import_is_limited_per_user():
+    app = limited_app(RATE_LIMITS={"bulk_toys": "1/hour"})
+    with app.app_context():
+        user = User(username="alice", email="alice@example.com", phone_number="0", password="x")
+        db.session.add(user)
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+    client = app.test_client()
+
+    toy = {"name": "kite", "age_group": "6-8", "description": "red kite", "condition": "new",
+           "price": 5, "image_filename": "kite.png"}
+    assert client.post("/toys/bulk", json=[toy], headers=headers).status_code == 201
+    response = client.post("/toys/bulk", json=[toy], headers=headers)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
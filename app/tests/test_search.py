@@ -0,0 +1,54 @@
+import pytest
+
+from models import Toy, db
+
+
+@pytest.fixture
+def toys(app, make_user):
+    user_id, _ = make_user("seller")
+    with app.app_context():
+        db.session.add_all([
+            Toy(name="red truck", age_group="3-5", description="a red truck", condition="used",
+                price=10, image_filename="toy.png", user_id=user_id),
+            Toy(name="truck", age_group="3-5", description="a blue toy", condition="new",
+                price=20, image_filename="toy.png", user_id=user_id),
+            Toy(name="fire truck", age_group="6-8", description="truck with a truck ladder", condition="new",
+                price=30, image_filename="toy.png", user_id=user_id),
+            Toy(name="dump truck", age_group="6-8", description="yellow", condition="used",
+                price=40, image_filename="toy.png", user_id=user_id),
+            Toy(name="kite", age_group="6-8", description="a red kite", condition="new",
+                price=5, image_filename="toy.png", user_id=user_id),
+        ])
+        db.session.commit()
+
+
+def test_ranked_pages_follow_the_cursor(client, toys):
+    everything = client.get("/toys/search?q=truck&limit=100").json
+    assert everything["next_cursor"] is None
+    ranked = [toy["id"] for toy in everything["toys"]]
+    assert sorted(ranked) == [1, 2, 3, 4]
+
+    seen, cursor = [], None
+    while True:
+        query = {"q": "truck", "limit": 3}
+        if cursor:
+            query["after"] = cursor
+        page = client.get("/toys/search", query_string=query).json
+        seen += [toy["id"] for toy in page["toys"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ranked
+
+
+def test_facets_ignore_their_own_filter(client, toys):
+    response = client.get("/toys/search?q=truck&condition=new")
+    assert {toy["id"] for toy in response.json["toys"]} == {2, 3}
+    assert response.json["facets"] == {
+        "age_group": {"3-5": 1, "6-8": 1},
+        "condition": {"new": 2, "used": 2},
+    }
+
+
+def test_bad_cursor_is_a_400(client, toys):
+    assert client.get("/toys/search?q=truck&after=nope").status_code == 400
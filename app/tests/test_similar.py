@@ -0,0 +1,26 @@
+import time
+
+from models import Toy, db
+
+
+def test_similar_answers_503_while_the_index_loads(app, client, make_user, tmp_path):
+    user_id, _ = make_user("seller")
+    with app.app_context():
+        db.session.add_all([
+            Toy(name=f"red truck {index}", age_group="3-5", description="a red truck", condition="used",
+                price=10, image_filename="truck.png", user_id=user_id)
+            for index in range(3)
+        ])
+        db.session.commit()
+    app.extensions["similar_toys"].snapshot_path = str(tmp_path / "similar_toys.pickle")
+
+    response = client.get("/toys/1/similar")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+
+    deadline = time.monotonic() + 10
+    while response.status_code == 503 and time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = client.get("/toys/1/similar")
+    assert response.status_code == 200
+    assert {toy["id"] for toy in response.json["similar"]} == {2, 3}
@@ -0,0 +1,113 @@
+import pytest
+
+from models import Payment, Toy, db
+
+
+@pytest.fixture
+def listing(app, make_user):
+    seller_id, seller = make_user("seller")
+    _, buyer = make_user("buyer")
+    with app.app_context():
+        toy = Toy(name="robot", age_group="6-8", description="a robot", condition="new",
+                  price=500, image_filename="robot.png", user_id=seller_id)
+        db.session.add(toy)
+        db.session.commit()
+        return toy.id, seller, buyer
+
+
+def toy_status(app, toy_id):
+    with app.app_context():
+        return db.session.get(Toy, toy_id).status
+
+
+def test_payment_amount_must_match_price(app, client, listing):
+    toy_id, _, buyer = listing
+    response = client.post("/payments", json={"toy_id": toy_id, "amount": 0.01}, headers=buyer)
+    assert response.status_code == 422
+    with app.app_context():
+        assert Payment.query.count() == 0
+
+
+def test_buyer_cannot_complete_own_payment(app, client, listing):
+    toy_id, seller, buyer = listing
+    payment = client.post("/payments", json={"toy_id": toy_id, "amount": 500}, headers=buyer)
+    assert payment.status_code == 201
+
+    response = client.post(f"/payments/{payment.json['id']}/complete", headers=buyer)
+    assert response.status_code == 403
+    assert toy_status(app, toy_id) == "Available"
+
+    response = client.post(f"/payments/{payment.json['id']}/complete", headers=seller)
+    assert response.status_code == 200
+    assert response.json["status"] == "Completed"
+    assert toy_status(app, toy_id) == "Sold"
+
+
+@pytest.fixture
+def swap(app, make_user):
+    seller_id, seller = make_user("seller")
+    buyer_id, buyer = make_user("buyer")
+    with app.app_context():
+        wanted = Toy(name="robot", age_group="6-8", description="a robot", condition="new",
+                     price=500, image_filename="robot.png", user_id=seller_id)
+        offered = Toy(name="kite", age_group="6-8", description="a kite", condition="used",
+                      price=20, image_filename="kite.png", user_id=buyer_id)
+        db.session.add_all([wanted, offered])
+        db.session.commit()
+        offer = {"buyer_toy_id": offered.id, "seller_toy_id": wanted.id}
+        return offer, seller, buyer
+
+
+def test_exchange_retry_returns_the_first_offer(client, swap):
+    offer, _, buyer = swap
+    headers = {**buyer, "Idempotency-Key": "offer-1"}
+    first = client.post("/exchanges", json=offer, headers=headers)
+    assert first.status_code == 201
+    assert first.json["status"] == "Pending"
+
+    retry = client.post("/exchanges", json=offer, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json["id"] == first.json["id"]
+    assert len(client.get("/exchanges", headers=buyer).json["exchanges"]) == 1
+
+
+def test_seller_accepts_exchange(app, client, swap):
+    offer, seller, buyer = swap
+    exchange = client.post("/exchanges", json=offer, headers=buyer).json
+
+    assert client.post(f"/exchanges/{exchange['id']}/accept", headers=buyer).status_code == 404
+    response = client.post(f"/exchanges/{exchange['id']}/accept", headers=seller)
+    assert response.status_code == 200
+    assert response.json["status"] == "Accepted"
+    assert toy_status(app, offer["buyer_toy_id"]) == toy_status(app, offer["seller_toy_id"]) == "Traded"
+    assert client.get("/home").json == []
+
+
+def test_seller_rejects_and_buyer_cancels(app, client, swap):
+    offer, seller, buyer = swap
+    rejected = client.post("/exchanges", json=offer, headers=buyer).json
+    assert client.post(f"/exchanges/{rejected['id']}/reject", headers=buyer).status_code == 404
+    response = client.post(f"/exchanges/{rejected['id']}/reject", headers=seller)
+    assert response.json["status"] == "Rejected"
+
+    cancelled = client.post("/exchanges", json=offer, headers=buyer).json
+    assert client.post(f"/exchanges/{cancelled['id']}/cancel", headers=seller).status_code == 404
+    response = client.post(f"/exchanges/{cancelled['id']}/cancel", headers=buyer)
+    assert response.json["status"] == "Cancelled"
+
+    # Closed exchanges can't move again, and the toys stay on sale
+    assert client.post(f"/exchanges/{cancelled['id']}/accept", headers=seller).status_code == 409
+    assert toy_status(app, offer["seller_toy_id"]) == "Available"
+
+
+def test_sold_toys_leave_home_and_search(client, listing):
+    toy_id, seller, buyer = listing
+    assert [toy["id"] for toy in client.get("/home").json] == [toy_id]
+
+    payment = client.post("/payments", json={"toy_id": toy_id, "amount": 500}, headers=buyer).json
+    client.post(f"/payments/{payment['id']}/complete", headers=seller)
+
+    assert client.get("/home").json == []
+    search = client.get("/toys/search?q=robot").json
+    assert search["toys"] == []
+    assert search["facets"] == {"age_group": {}, "condition": {}}
@@ -0,0 +1,196 @@
+"""Payment and exchange state machines.
+
+Every state change is a compare-and-set ``UPDATE ... WHERE status = <old>``,
+and selling or trading a toy is the same on ``toys.status`` (bumping
+``toys.version``), so two requests racing for one toy or one transition
+can never both win. On PostgreSQL the rows are also locked with
+``SELECT ... FOR UPDATE`` before the checks; SQLite serializes writers on
+its own. A payment must be for the toy's listed price, and only the seller
+confirms it (Pending -> Completed); the buyer can only cancel. Creates take
+an optional client idempotency key: a retry with the same key returns the
+row made by the first attempt. Callers roll the session back when a
+``TradeError`` escapes.
+"""
+import math
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Toy, Payment, Exchange
+
+PAYMENT_TRANSITIONS = {
+    "Pending": {"Completed", "Failed", "Cancelled"},
+}
+EXCHANGE_TRANSITIONS = {
+    "Pending": {"Accepted", "Rejected", "Cancelled", "Failed"},
+}
+
+
+class TradeError(Exception):
+    def __init__(self, message, status_code=409):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _transition(model, transitions, row_id, old_status, new_status):
+    """Move ``row_id`` from ``old_status`` to ``new_status`` if nobody beat us to it."""
+    if new_status not in transitions.get(old_status, ()):
+        raise TradeError(f"Cannot move from {old_status} to {new_status}")
+    updated = (
+        model.query
+        .filter(model.id == row_id, model.status == old_status)
+        .update({model.status: new_status}, synchronize_session=False)
+    )
+    if updated != 1:
+        raise TradeError(f"{model.__name__} is no longer {old_status}")
+
+
+def _claim_toy(toy_id, new_status):
+    """Take an Available toy off the market; False if someone else got it first."""
+    updated = (
+        Toy.query
+        .filter(Toy.id == toy_id, Toy.status == "Available")
+        .update({Toy.status: new_status, Toy.version: Toy.version + 1}, synchronize_session=False)
+    )
+    return updated == 1
+
+
+def _locked(model, row_id):
+    return model.query.filter_by(id=row_id).with_for_update().first()
+
+
+def _create_once(model, buyer_id, idempotency_key, validate, build):
+    """Insert the row ``build()`` returns unless this key was already used.
+
+    ``validate`` only runs for new rows, so a retry still gets its original
+    row back after the toy has been sold.
+    """
+    if idempotency_key:
+        existing = model.query.filter_by(buyer_id=buyer_id, idempotency_key=idempotency_key).first()
+        if existing:
+            return existing, False
+    validate()
+    row = build()
+    row.idempotency_key = idempotency_key
+    db.session.add(row)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key committed first
+        db.session.rollback()
+        existing = model.query.filter_by(buyer_id=buyer_id, idempotency_key=idempotency_key).first()
+        if existing is None:
+            raise
+        return existing, False
+    return row, True
+
+
+# ============================
+# PAYMENTS
+# ============================
+def create_payment(buyer_id, toy_id, amount, idempotency_key=None):
+    def validate():
+        toy = db.session.get(Toy, toy_id)
+        if toy is None:
+            raise TradeError("Toy not found", 404)
+        if toy.user_id == buyer_id:
+            raise TradeError("You can't buy your own toy", 422)
+        if toy.status != "Available":
+            raise TradeError("Toy is no longer available")
+        if not math.isclose(amount, toy.price, abs_tol=0.005):
+            raise TradeError("Amount must match the toy's price", 422)
+
+    return _create_once(
+        Payment, buyer_id, idempotency_key, validate,
+        lambda: Payment(amount=amount, status="Pending", buyer_id=buyer_id, toy_id=toy_id),
+    )
+
+
+def complete_payment(payment_id, user_id):
+    """Seller confirms a pending payment; fails it if the toy was sold in the meantime."""
+    payment = _locked(Payment, payment_id)
+    if payment is None or payment.toy.user_id != user_id:
+        if payment is not None and payment.buyer_id == user_id:
+            raise TradeError("Only the seller can confirm a payment", 403)
+        raise TradeError("Payment not found", 404)
+    _transition(Payment, PAYMENT_TRANSITIONS, payment.id, payment.status, "Completed")
+    if not _claim_toy(payment.toy_id, "Sold"):
+        db.session.rollback()
+        _transition(Payment, PAYMENT_TRANSITIONS, payment_id, "Pending", "Failed")
+        db.session.commit()
+        raise TradeError("Toy is no longer available")
+    db.session.commit()
+    return payment
+
+
+def cancel_payment(payment_id, user_id):
+    payment = _locked(Payment, payment_id)
+    if payment is None or payment.buyer_id != user_id:
+        raise TradeError("Payment not found", 404)
+    _transition(Payment, PAYMENT_TRANSITIONS, payment.id, payment.status, "Cancelled")
+    db.session.commit()
+    return payment
+
+
+def list_payments(user_id, limit=100):
+    """Payments the user made plus payments for the user's toys, newest first."""
+    as_buyer = Payment.query.filter(Payment.buyer_id == user_id)
+    as_seller = Payment.query.join(Toy, Toy.id == Payment.toy_id).filter(Toy.user_id == user_id)
+    return as_buyer.union(as_seller).order_by(Payment.id.desc()).limit(limit).all()
+
+
+# ============================
+# EXCHANGES
+# ============================
+def create_exchange(buyer_id, buyer_toy_id, seller_toy_id, idempotency_key=None):
+    def validate():
+        buyer_toy = db.session.get(Toy, buyer_toy_id)
+        seller_toy = db.session.get(Toy, seller_toy_id)
+        if buyer_toy is None or seller_toy is None:
+            raise TradeError("Toy not found", 404)
+        if buyer_toy.user_id != buyer_id:
+            raise TradeError("You can only offer your own toy", 422)
+        if seller_toy.user_id == buyer_id:
+            raise TradeError("You can't exchange with yourself", 422)
+        if buyer_toy.status != "Available" or seller_toy.status != "Available":
+            raise TradeError("Toy is no longer available")
+
+    return _create_once(
+        Exchange, buyer_id, idempotency_key, validate,
+        lambda: Exchange(status="Pending", buyer_id=buyer_id, buyer_toy_id=buyer_toy_id, seller_toy_id=seller_toy_id),
+    )
+
+
+def accept_exchange(exchange_id, user_id):
+    """Seller accepts: both toys are traded together, or the exchange fails."""
+    exchange = _locked(Exchange, exchange_id)
+    if exchange is None or exchange.seller_toy.user_id != user_id:
+        raise TradeError("Exchange not found", 404)
+    _transition(Exchange, EXCHANGE_TRANSITIONS, exchange.id, exchange.status, "Accepted")
+    if not (_claim_toy(exchange.buyer_toy_id, "Traded") and _claim_toy(exchange.seller_toy_id, "Traded")):
+        db.session.rollback()
+        _transition(Exchange, EXCHANGE_TRANSITIONS, exchange_id, "Pending", "Failed")
+        db.session.commit()
+        raise TradeError("Toy is no longer available")
+    db.session.commit()
+    return exchange
+
+
+def close_exchange(exchange_id, user_id, new_status):
+    """Seller rejects or buyer cancels a pending exchange."""
+    exchange = _locked(Exchange, exchange_id)
+    if exchange is None:
+        raise TradeError("Exchange not found", 404)
+    allowed_user = exchange.seller_toy.user_id if new_status == "Rejected" else exchange.buyer_id
+    if allowed_user != user_id:
+        raise TradeError("Exchange not found", 404)
+    _transition(Exchange, EXCHANGE_TRANSITIONS, exchange.id, exchange.status, new_status)
+    db.session.commit()
+    return exchange
+
+
+def list_exchanges(user_id, limit=100):
+    """Exchanges the user proposed plus those asking for the user's toys, newest first."""
+    as_buyer = Exchange.query.filter(Exchange.buyer_id == user_id)
+    as_seller = Exchange.query.join(Toy, Toy.id == Exchange.seller_toy_id).filter(Toy.user_id == user_id)
+    return as_buyer.union(as_seller).order_by(Exchange.id.desc()).limit(limit).all()
@@ -0,0 +1,136 @@
+import time
+import weakref
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+from sqlalchemy import event
+
+from models import User
+
+CachedUser = namedtuple("CachedUser", ["id", "username", "email"])
+
+# Every live cache, so one set of ORM listeners serves all apps in the process
+_caches = weakref.WeakSet()
+
+
+class UserCache:
+    """Bounded LRU/TTL cache of user id <-> username <-> email.
+
+    Entries are dropped as soon as a ``User`` row is updated or deleted
+    through the ORM, so callers never see a stale username or email.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._by_id = OrderedDict()  # id -> (CachedUser, expires_at)
+        self._by_username = {}
+        self._by_email = {}
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        _caches.add(self)
+
+    def get_by_id(self, user_id):
+        return self._lookup(user_id, lambda: User.query.filter_by(id=user_id))
+
+    def get_by_username(self, username):
+        with self._lock:
+            user_id = self._by_username.get(username)
+        return self._lookup(user_id, lambda: User.query.filter_by(username=username))
+
+    def get_by_email(self, email):
+        with self._lock:
+            user_id = self._by_email.get(email)
+        return self._lookup(user_id, lambda: User.query.filter_by(email=email))
+
+    def usernames_for(self, user_ids):
+        """Map each id to its username, loading every miss in one query."""
+        usernames = {}
+        missing = set()
+        for user_id in set(user_ids):
+            cached = self._get(user_id)
+            if cached is None:
+                missing.add(user_id)
+            else:
+                usernames[user_id] = cached.username
+        if missing:
+            rows = User.query.with_entities(User.id, User.username, User.email).filter(User.id.in_(missing)).all()
+            for row in rows:
+                usernames[row.id] = self._put(row).username
+        return usernames
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._drop(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._by_id.clear()
+            self._by_username.clear()
+            self._by_email.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._by_id),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _lookup(self, user_id, load):
+        cached = self._get(user_id) if user_id is not None else None
+        if cached is not None:
+            return cached
+        if user_id is None:
+            self.misses += 1
+        row = load().with_entities(User.id, User.username, User.email).first()
+        return self._put(row) if row else None
+
+    def _get(self, user_id):
+        with self._lock:
+            entry = self._by_id.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at < time.monotonic():
+                self._drop(user_id)
+                self.misses += 1
+                return None
+            self._by_id.move_to_end(user_id)
+            self.hits += 1
+            return user
+
+    def _put(self, row):
+        user = CachedUser(row.id, row.username, row.email)
+        with self._lock:
+            self._drop(user.id)
+            self._by_id[user.id] = (user, time.monotonic() + self.ttl)
+            self._by_username[user.username] = user.id
+            self._by_email[user.email] = user.id
+            while len(self._by_id) > self.maxsize:
+                oldest_id = next(iter(self._by_id))
+                self._drop(oldest_id)
+                self.evictions += 1
+        return user
+
+    def _drop(self, user_id):
+        # Caller holds the lock
+        entry = self._by_id.pop(user_id, None)
+        if entry is not None:
+            user = entry[0]
+            if self._by_username.get(user.username) == user_id:
+                del self._by_username[user.username]
+            if self._by_email.get(user.email) == user_id:
+                del self._by_email[user.email]
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _on_user_write(mapper, connection, target):
+    for cache in list(_caches):
+        cache.invalidate(target.id)